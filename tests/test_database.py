@@ -0,0 +1,50 @@
+"""Tests for the Zeddring database layer."""
+
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from zeddring import database
+
+class DailyStatsTest(unittest.TestCase):
+    """Daily stats read from the heart_rate_daily and steps_daily rollups."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patcher = mock.patch.object(database, 'DB_PATH', os.path.join(tmpdir.name, 'zeddring.sqlite'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.db = database.Database()
+        self.ring_id = self.db.add_ring('R02_TEST', 'AA:BB:CC:DD:EE:FF')
+        # Stored timestamps are UTC, like CURRENT_TIMESTAMP
+        self.midnight = datetime.datetime.now(datetime.timezone.utc).replace(
+            tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+    def test_window_is_whole_utc_days(self):
+        for days_ago, value in ((0, 70), (2, 80), (3, 90)):
+            timestamp = self.midnight - datetime.timedelta(days=days_ago) + datetime.timedelta(seconds=1)
+            self.db.add_heart_rate_with_timestamp(self.ring_id, value, timestamp)
+            self.db.add_steps_with_timestamp(self.ring_id, value * 100, timestamp)
+
+        dates = [(self.midnight - datetime.timedelta(days=days_ago)).strftime('%Y-%m-%d') for days_ago in (0, 2)]
+        self.assertEqual([row['date'] for row in self.db.get_daily_heart_rate_stats(self.ring_id, 2)], dates)
+        self.assertEqual([row['date'] for row in self.db.get_daily_steps_stats(self.ring_id, 2)], dates)
+
+    def test_rollup_aggregates(self):
+        for minute, value in enumerate((60, 75, 90)):
+            self.db.add_heart_rate_with_timestamp(self.ring_id, value, self.midnight + datetime.timedelta(minutes=minute))
+        for minute, value in enumerate((1000, 2500, 1800)):
+            self.db.add_steps_with_timestamp(self.ring_id, value, self.midnight + datetime.timedelta(minutes=minute))
+
+        [heart_rate] = self.db.get_daily_heart_rate_stats(self.ring_id, 1)
+        self.assertEqual((heart_rate['min_value'], heart_rate['max_value'], heart_rate['count']), (60, 90, 3))
+        self.assertAlmostEqual(heart_rate['avg_value'], 75.0)
+        [steps] = self.db.get_daily_steps_stats(self.ring_id, 1)
+        self.assertEqual(steps['max_value'], 2500)
+
+if __name__ == '__main__':
+    unittest.main()
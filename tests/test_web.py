@@ -0,0 +1,101 @@
+"""Tests for the Zeddring web interface."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from zeddring import database
+
+try:
+    import flask
+    FLASK_AVAILABLE = True
+except ImportError:
+    FLASK_AVAILABLE = False
+
+try:
+    import flask_compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
+# The ring manager is a process-wide singleton, so all tests share one app
+app = None
+ring_manager = None
+ring_id = None
+
+def setUpModule():
+    global app, ring_manager, ring_id, _tmpdir, _db_path
+    if not FLASK_AVAILABLE:
+        raise unittest.SkipTest("flask is not installed")
+
+    _tmpdir = tempfile.TemporaryDirectory()
+    _db_path = mock.patch.object(database, 'DB_PATH', os.path.join(_tmpdir.name, 'zeddring.sqlite'))
+    _db_path.start()
+
+    from zeddring import web
+    database.init_db()
+    app = web.init_app()
+    ring_manager = app.config['RING_MANAGER']
+
+    # Enough readings for the response to exceed COMPRESS_MIN_SIZE
+    ring_id = ring_manager.db.add_ring('R02_TEST', 'AA:BB:CC:DD:EE:FF')
+    for value in range(60, 100):
+        ring_manager.db.add_readings(ring_id, heart_rate=value)
+
+def tearDownModule():
+    ring_manager.shutdown()
+    _db_path.stop()
+    _tmpdir.cleanup()
+
+@unittest.skipUnless(COMPRESS_AVAILABLE, "flask-compress is not installed")
+class ConditionalResponseTest(unittest.TestCase):
+    """ETag revalidation of compressed API responses."""
+
+    def test_compressed_etag_revalidates(self):
+        # Older Flask-Compress releases do not evaluate conditional requests
+        # themselves, so the view has to recognise the ":gzip" ETag
+        app.config['COMPRESS_EVALUATE_CONDITIONAL_REQUEST'] = False
+        client = app.test_client()
+        url = f'/api/ring/{ring_id}/heart-rate'
+
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        etag = response.headers['ETag']
+        self.assertTrue(etag.endswith(':gzip"'))
+
+        response = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+class RingEventsTest(unittest.TestCase):
+    """Limits on the /api/ring/<id>/events streams."""
+
+    def test_unknown_ring_is_not_found(self):
+        response = app.test_client().get('/api/ring/9999/events')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(9999, ring_manager._ring_versions)
+
+    def test_streams_beyond_limit_are_refused(self):
+        from zeddring import web
+        client = app.test_client()
+        url = f'/api/ring/{ring_id}/events'
+
+        streams = [client.get(url, buffered=False) for _ in range(web.MAX_EVENT_STREAMS)]
+        try:
+            self.assertEqual([stream.status_code for stream in streams], [200] * web.MAX_EVENT_STREAMS)
+            response = client.get(url)
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('Retry-After', response.headers)
+        finally:
+            for stream in streams:
+                stream.close()
+
+        # Closing the streams frees their slots
+        stream = client.get(url, buffered=False)
+        self.assertEqual(stream.status_code, 200)
+        stream.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,13 +16,13 @@ logger = logging.getLogger("zeddring.app")
 
 # Import components
 try:
-    from zeddring.database import Database, init_db
+    from zeddring.database import init_db
     from zeddring.ring_manager import RingManager, get_ring_manager
     from zeddring.hr_logger import HeartRateLogger
-    from zeddring.web import app as web_app
+    from zeddring.web import init_app, run_server
     from zeddring.config import WEB_HOST, WEB_PORT, DEBUG
 except ImportError as e:
-    logger.error(f"Error importing components: {e}")
+    logger.error("Error importing components: %s", e)
     sys.exit(1)
 
 def main():
@@ -31,11 +31,11 @@ def main():
         # Initialize database
         logger.info("Initializing database...")
         init_db()
-        db = Database()
         
-        # Initialize ring manager
+        # Initialize ring manager; everything shares its database
         logger.info("Initializing ring manager...")
         ring_manager = get_ring_manager()
+        db = ring_manager.db
         
         # Try to fix Bluetooth permissions if running in Docker
         try:
@@ -48,9 +48,9 @@ def main():
                 subprocess.run(["hciconfig", "hci0", "up"], check=False)
                 logger.info("Bluetooth device brought up")
             except Exception as e:
-                logger.warning(f"Could not bring up Bluetooth device: {e}")
+                logger.warning("Could not bring up Bluetooth device: %s", e)
         except Exception as e:
-            logger.warning(f"Could not check Bluetooth status: {e}")
+            logger.warning("Could not check Bluetooth status: %s", e)
         
         # Start ring manager
         ring_manager.start()
@@ -66,18 +66,17 @@ def main():
         debug = DEBUG
         
         # Start web server
-        logger.info(f"Starting web server on {host}:{port} (debug={debug})...")
-        web_app.config['RING_MANAGER'] = ring_manager
-        web_app.config['DATABASE'] = db
-        web_app.run(host=host, port=port, debug=debug)
+        logger.info("Starting web server on %s:%s (debug=%s)...", host, port, debug)
+        init_app()
+        run_server(host, port, debug)
         
     except Exception as e:
-        logger.error(f"Error starting application: {e}")
+        logger.error("Error starting application: %s", e)
         sys.exit(1)
     finally:
         # Clean up
         if 'ring_manager' in locals():
-            ring_manager.stop()
+            ring_manager.shutdown()
         if 'hr_logger' in locals():
             hr_logger.stop()
 
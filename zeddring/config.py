@@ -13,6 +13,7 @@ DATABASE_PATH = os.environ.get('ZEDDRING_DB_PATH', str(BASE_DIR / "zeddring_data
 WEB_HOST = os.environ.get('ZEDDRING_WEB_HOST', '0.0.0.0')
 WEB_PORT = int(os.environ.get('ZEDDRING_WEB_PORT', 5000))
 DEBUG = os.environ.get('ZEDDRING_DEBUG', 'False').lower() == 'true'
+WEB_THREADS = int(os.environ.get('ZEDDRING_WEB_THREADS', 16))
 
 # Bluetooth scanning configuration
 SCAN_INTERVAL = int(os.environ.get('ZEDDRING_SCAN_INTERVAL', 20))
@@ -20,6 +21,8 @@ SCAN_TIMEOUT = int(os.environ.get('ZEDDRING_SCAN_TIMEOUT', 10))
 MAX_RETRY_ATTEMPTS = int(os.environ.get('ZEDDRING_MAX_RETRY_ATTEMPTS', 3))
 RETRY_DELAY = int(os.environ.get('ZEDDRING_RETRY_DELAY', 300))
 PERSISTENT_CONNECTION = os.environ.get('ZEDDRING_PERSISTENT_CONNECTION', 'True').lower() == 'true'
+BLE_MAX_CONCURRENT = int(os.environ.get('ZEDDRING_BLE_MAX_CONCURRENT', 3))
+BLE_MIN_RSSI = int(os.environ.get('ZEDDRING_BLE_MIN_RSSI', -80))
 
 # Ring configuration
 DEFAULT_RING_NAME = os.environ.get('ZEDDRING_DEFAULT_RING_NAME', 'Colmi R02')
@@ -6,18 +6,18 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import os
 import logging
+import threading
+import time
 
 from zeddring.config import DATABASE_PATH
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("zeddring.database")
 
 # Get database path from environment variable or use default
 DB_PATH = os.environ.get('ZEDDRING_DB_PATH', DATABASE_PATH)
+# Number of ring rows Database.get_ring keeps, and for how long (seconds)
+RING_CACHE_SIZE = 64
+RING_CACHE_TTL = 60
 
 def get_db_connection():
     """Get a connection to the SQLite database."""
@@ -25,9 +25,24 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row
     return conn
 
+def row_get(row, key, default=None):
+    """Get a column from a sqlite3.Row, which has no get method."""
+    try:
+        return row[key]
+    except (IndexError, KeyError):
+        return default
+
+def configure_connection(conn):
+    """Apply the pragmas used for long-lived connections."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=134217728")
+    conn.execute("PRAGMA cache_size=-65536")
+
 def init_db():
     """Initialize the database with required tables."""
-    logger.info(f"Initializing database at {DB_PATH}")
+    logger.info("Initializing database at %s", DB_PATH)
     
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
@@ -45,6 +60,7 @@ def init_db():
         battery_level INTEGER,
         is_mock INTEGER DEFAULT 0,
         last_sync TIMESTAMP,
+        last_disconnected TIMESTAMP,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     ''')
@@ -82,6 +98,74 @@ def init_db():
     )
     ''')
     
+    # Index the per-ring history lookups used when syncing and charting.
+    # The value column is included so those reads never touch the table.
+    for table in ('heart_rate', 'steps', 'battery'):
+        cursor.execute(f"DROP INDEX IF EXISTS ix_{table}_ring_ts")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_ring_ts_value ON {table} (ring_id, timestamp, value)")
+    
+    # Per-day rollups of heart rate and steps for the daily stats, kept up to
+    # date by triggers so every insert path maintains them
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('heart_rate_daily', 'steps_daily')")
+    existing_rollups = {row[0] for row in cursor.fetchall()}
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS heart_rate_daily (
+        ring_id INTEGER NOT NULL,
+        date TEXT,
+        min_value INTEGER,
+        max_value INTEGER,
+        sum_value INTEGER,
+        count INTEGER,
+        PRIMARY KEY (ring_id, date)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS steps_daily (
+        ring_id INTEGER NOT NULL,
+        date TEXT,
+        max_value INTEGER,
+        PRIMARY KEY (ring_id, date)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS tr_heart_rate_daily AFTER INSERT ON heart_rate BEGIN
+        INSERT INTO heart_rate_daily (ring_id, date, min_value, max_value, sum_value, count)
+        VALUES (NEW.ring_id, date(NEW.timestamp), NEW.value, NEW.value, NEW.value, 1)
+        ON CONFLICT (ring_id, date) DO UPDATE SET
+            min_value = MIN(min_value, excluded.min_value),
+            max_value = MAX(max_value, excluded.max_value),
+            sum_value = sum_value + excluded.sum_value,
+            count = count + 1;
+    END
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS tr_steps_daily AFTER INSERT ON steps BEGIN
+        INSERT INTO steps_daily (ring_id, date, max_value)
+        VALUES (NEW.ring_id, date(NEW.timestamp), NEW.value)
+        ON CONFLICT (ring_id, date) DO UPDATE SET max_value = MAX(max_value, excluded.max_value);
+    END
+    ''')
+    
+    # Fill new rollup tables from the readings already stored
+    if 'heart_rate_daily' not in existing_rollups:
+        cursor.execute('''
+        INSERT INTO heart_rate_daily (ring_id, date, min_value, max_value, sum_value, count)
+        SELECT ring_id, date(timestamp), MIN(value), MAX(value), SUM(value), COUNT(*)
+        FROM heart_rate GROUP BY ring_id, date(timestamp)
+        ''')
+        logger.info("Built heart_rate_daily with %s rows", cursor.rowcount)
+    if 'steps_daily' not in existing_rollups:
+        cursor.execute('''
+        INSERT INTO steps_daily (ring_id, date, max_value)
+        SELECT ring_id, date(timestamp), MAX(value)
+        FROM steps GROUP BY ring_id, date(timestamp)
+        ''')
+        logger.info("Built steps_daily with %s rows", cursor.rowcount)
+    
     # Check if required columns exist in rings table
     cursor.execute("PRAGMA table_info(rings)")
     columns = cursor.fetchall()
@@ -109,6 +193,13 @@ def init_db():
         except sqlite3.OperationalError:
             logger.info("last_sync column already exists in rings table")
     
+    if 'last_disconnected' not in column_names:
+        try:
+            cursor.execute("ALTER TABLE rings ADD COLUMN last_disconnected TIMESTAMP")
+            logger.info("Added last_disconnected column to rings table")
+        except sqlite3.OperationalError:
+            logger.info("last_disconnected column already exists in rings table")
+    
     conn.commit()
     conn.close()
     
@@ -120,125 +211,197 @@ class Database:
     def __init__(self):
         """Initialize the database."""
         init_db()
+        
+        # Long-lived connection shared by the writer methods; every INSERT,
+        # UPDATE and DELETE goes through it under _write_lock
+        self._conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        configure_connection(self._conn)
+        self._write_lock = threading.Lock()
+        # One reusable connection per thread for the read methods
+        self._local = threading.local()
+        # Ring rows are looked up by id at the start of most operations;
+        # writers that touch the rings table clear this cache and bump the
+        # generation, so rows read before the change are not stored
+        self._ring_cache = {}
+        self._ring_cache_generation = 0
+        self._ring_cache_lock = threading.Lock()
+    
+    def _thread_connection(self):
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(DB_PATH)
+            conn.row_factory = sqlite3.Row
+            configure_connection(conn)
+            self._local.conn = conn
+        return conn
+    
+    def _release_connection(self, conn):
+        """Finish with a thread connection, rolling back anything left uncommitted."""
+        if conn.in_transaction:
+            conn.rollback()
+    
+    def invalidate_ring_cache(self):
+        """Drop cached ring rows after the rings table changes."""
+        with self._ring_cache_lock:
+            self._ring_cache_generation += 1
+            self._ring_cache.clear()
     
     def add_ring(self, name, mac_address):
         """Add a new ring to the database."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO rings (name, mac_address) VALUES (?, ?)",
-                (name, mac_address)
-            )
-            conn.commit()
+            with self._write_lock, self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO rings (name, mac_address) VALUES (?, ?)",
+                    (name, mac_address)
+                )
             ring_id = cursor.lastrowid
-            logger.info(f"Added new ring: {name} ({mac_address})")
+            logger.info("Added new ring: %s (%s)", name, mac_address)
             return ring_id
         except sqlite3.IntegrityError:
             # Ring with this MAC address already exists
-            cursor.execute(
-                "SELECT id FROM rings WHERE mac_address = ?",
-                (mac_address,)
-            )
-            ring_id = cursor.fetchone()[0]
-            logger.info(f"Ring with MAC {mac_address} already exists with ID {ring_id}")
+            ring = self.get_ring_by_mac(mac_address)
+            ring_id = ring['id']
+            logger.info("Ring with MAC %s already exists with ID %s", mac_address, ring_id)
             return ring_id
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
     
     def update_ring_connection(self, ring_id):
         """Update the last_connected timestamp for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "UPDATE rings SET connected = 1, last_connected = CURRENT_TIMESTAMP WHERE id = ?",
-                (datetime.datetime.now(), ring_id)
-            )
-            conn.commit()
-            logger.info(f"Updated connection status for ring {ring_id} to connected")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "UPDATE rings SET last_connected = CURRENT_TIMESTAMP WHERE id = ?",
+                    (ring_id,)
+                )
+            self.invalidate_ring_cache()
+            logger.info("Updated last_connected for ring %s", ring_id)
         except Exception as e:
-            logger.error(f"Error updating connection status for ring {ring_id}: {e}")
-        finally:
-            conn.close()
+            logger.error("Error updating connection status for ring %s: %s", ring_id, e)
     
     def get_rings(self):
         """Get all rings from the database."""
-        conn = get_db_connection()
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM rings ORDER BY name")
         rings = cursor.fetchall()
         
-        conn.close()
+        self._release_connection(conn)
+        return rings
+    
+    def get_ring_dicts(self):
+        """Get all rings as plain dicts, building each from the column list once per query."""
+        conn = self._thread_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        
+        cursor.execute("SELECT * FROM rings ORDER BY name")
+        columns = [description[0] for description in cursor.description]
+        rings = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        self._release_connection(conn)
         return rings
     
     def get_ring(self, ring_id):
         """Get a specific ring by ID."""
-        conn = get_db_connection()
+        now = time.monotonic()
+        with self._ring_cache_lock:
+            entry = self._ring_cache.get(ring_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            generation = self._ring_cache_generation
+        
+        ring = self._fetch_ring(ring_id)
+        
+        with self._ring_cache_lock:
+            if generation == self._ring_cache_generation:
+                if ring_id not in self._ring_cache and len(self._ring_cache) >= RING_CACHE_SIZE:
+                    # Evict the oldest entry
+                    del self._ring_cache[next(iter(self._ring_cache))]
+                self._ring_cache[ring_id] = (now + RING_CACHE_TTL, ring)
+        return ring
+    
+    def _fetch_ring(self, ring_id):
+        """Read a ring row from the database."""
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM rings WHERE id = ?", (ring_id,))
         ring = cursor.fetchone()
         
-        conn.close()
+        self._release_connection(conn)
         return ring
     
     def get_ring_by_mac(self, mac_address):
         """Get a ring by MAC address."""
-        conn = get_db_connection()
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM rings WHERE mac_address = ?", (mac_address,))
         ring = cursor.fetchone()
         
-        conn.close()
+        self._release_connection(conn)
         return ring
     
     def add_heart_rate(self, ring_id, value):
         """Add a heart rate reading for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO heart_rate (ring_id, value) VALUES (?, ?)",
-            (ring_id, value)
-        )
-        conn.commit()
-        conn.close()
-        logger.debug(f"Added heart rate {value} for ring {ring_id}")
+        with self._write_lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO heart_rate (ring_id, value) VALUES (?, ?)",
+                (ring_id, value)
+            )
+        logger.debug("Added heart rate %s for ring %s", value, ring_id)
     
     def add_steps(self, ring_id, value):
         """Add a steps reading for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO steps (ring_id, value) VALUES (?, ?)",
-            (ring_id, value)
-        )
-        conn.commit()
-        conn.close()
-        logger.debug(f"Added steps {value} for ring {ring_id}")
+        with self._write_lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO steps (ring_id, value) VALUES (?, ?)",
+                (ring_id, value)
+            )
+        logger.debug("Added steps %s for ring %s", value, ring_id)
     
     def add_battery(self, ring_id, value):
         """Add a battery reading for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO battery (ring_id, value) VALUES (?, ?)",
-            (ring_id, value)
-        )
-        conn.commit()
-        conn.close()
-        logger.debug(f"Added battery {value}% for ring {ring_id}")
+        with self._write_lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO battery (ring_id, value) VALUES (?, ?)",
+                (ring_id, value)
+            )
+        logger.debug("Added battery %s%% for ring %s", value, ring_id)
+    
+    def add_readings(self, ring_id, heart_rate=None, steps=None, battery=None):
+        """Add the readings from one collection cycle in a single transaction."""
+        with self._write_lock, self._conn:
+            if heart_rate is not None:
+                self._conn.execute(
+                    "INSERT INTO heart_rate (ring_id, value) VALUES (?, ?)",
+                    (ring_id, heart_rate)
+                )
+            if steps is not None:
+                self._conn.execute(
+                    "INSERT INTO steps (ring_id, value) VALUES (?, ?)",
+                    (ring_id, steps)
+                )
+            if battery is not None:
+                self._conn.execute(
+                    "INSERT INTO battery (ring_id, value) VALUES (?, ?)",
+                    (ring_id, battery)
+                )
+                self._conn.execute(
+                    "UPDATE rings SET battery_level = ?, last_connected = CURRENT_TIMESTAMP WHERE id = ?",
+                    (battery, ring_id)
+                )
+        if battery is not None:
+            self.invalidate_ring_cache()
+        logger.debug("Added readings for ring %s: heart rate %s, steps %s, battery %s", ring_id, heart_rate, steps, battery)
     
     def get_heart_rate_data(self, ring_id, limit=100):
         """Get heart rate data for a ring."""
-        conn = get_db_connection()
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -247,12 +410,28 @@ class Database:
         )
         data = cursor.fetchall()
         
-        conn.close()
+        self._release_connection(conn)
         return data
     
+    def get_heart_rate_stats(self, ring_id, limit=100):
+        """Get (min, max, avg) over a ring's latest heart rate readings, or None if there are none."""
+        conn = self._thread_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            """SELECT MIN(value), MAX(value), AVG(value), COUNT(*) FROM (
+                SELECT value FROM heart_rate WHERE ring_id = ? ORDER BY timestamp DESC LIMIT ?
+            )""",
+            (ring_id, limit)
+        )
+        min_value, max_value, avg_value, count = cursor.fetchone()
+        
+        self._release_connection(conn)
+        return (min_value, max_value, avg_value) if count else None
+    
     def get_steps_data(self, ring_id, limit=100):
         """Get steps data for a ring."""
-        conn = get_db_connection()
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -261,12 +440,12 @@ class Database:
         )
         data = cursor.fetchall()
         
-        conn.close()
+        self._release_connection(conn)
         return data
     
     def get_battery_data(self, ring_id, limit=100):
         """Get battery data for a ring."""
-        conn = get_db_connection()
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -275,235 +454,295 @@ class Database:
         )
         data = cursor.fetchall()
         
-        conn.close()
+        self._release_connection(conn)
         return data
 
-    def remove_ring(self, ring_id: int) -> bool:
-        """Remove a ring and all its data from the database."""
-        conn = get_db_connection()
+    def get_heart_rate_data_batch(self, ring_ids, limit=100):
+        """Get heart rate data for several rings at once, keyed by ring id."""
+        return self._get_data_batch('heart_rate', ring_ids, limit)
+    
+    def get_steps_data_batch(self, ring_ids, limit=100):
+        """Get steps data for several rings at once, keyed by ring id."""
+        return self._get_data_batch('steps', ring_ids, limit)
+    
+    def _get_data_batch(self, table, ring_ids, limit):
+        """Get the latest limit readings of each ring in one query.
+        
+        Returns {ring_id: [{'value', 'timestamp'}, ...]} with the newest reading
+        first; rings without readings map to an empty list.
+        """
+        result = {ring_id: [] for ring_id in ring_ids}
+        if not result:
+            return result
+        
+        conn = self._thread_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(result))
+        cursor.execute(f"""
+            SELECT ring_id, value, timestamp FROM (
+                SELECT ring_id, value, timestamp,
+                       ROW_NUMBER() OVER (PARTITION BY ring_id ORDER BY timestamp DESC) AS rn
+                FROM {table} WHERE ring_id IN ({placeholders})
+            )
+            WHERE rn <= ?
+            ORDER BY ring_id, timestamp DESC
+        """, (*result, limit))
+        
+        for row in cursor.fetchall():
+            result[row['ring_id']].append({'value': row['value'], 'timestamp': row['timestamp']})
+        self._release_connection(conn)
+        
+        return result
+
+    def get_latest_metrics_all_rings(self) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        """Get the latest heart rate, steps and battery reading of every ring.
+        
+        Returns a dict keyed by metric name, each mapping ring_id to a
+        {'value', 'timestamp'} dict. Relies on SQLite returning the bare
+        columns of the row that matched MAX(timestamp).
+        """
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
+        cursor.execute("""
+            SELECT 'heart_rate' AS metric, ring_id, value, MAX(timestamp) AS timestamp
+            FROM heart_rate GROUP BY ring_id
+            UNION ALL
+            SELECT 'steps', ring_id, value, MAX(timestamp) FROM steps GROUP BY ring_id
+            UNION ALL
+            SELECT 'battery', ring_id, value, MAX(timestamp) FROM battery GROUP BY ring_id
+        """)
+        
+        result = {'heart_rate': {}, 'steps': {}, 'battery': {}}
+        for row in cursor.fetchall():
+            result[row['metric']][row['ring_id']] = {'value': row['value'], 'timestamp': row['timestamp']}
+        self._release_connection(conn)
+        
+        return result
+    
+    def remove_ring(self, ring_id: int) -> bool:
+        """Remove a ring and all its data from the database."""
         try:
-            # Start a transaction
-            conn.execute("BEGIN TRANSACTION")
-            
-            # Delete heart rate data
-            cursor.execute("DELETE FROM heart_rate WHERE ring_id = ?", (ring_id,))
-            
-            # Delete steps data
-            cursor.execute("DELETE FROM steps WHERE ring_id = ?", (ring_id,))
-            
-            # Delete battery data
-            cursor.execute("DELETE FROM battery WHERE ring_id = ?", (ring_id,))
-            
-            # Delete the ring
-            cursor.execute("DELETE FROM rings WHERE id = ?", (ring_id,))
-            
-            # Commit the transaction
-            conn.commit()
+            # One transaction; rolled back if any statement fails
+            with self._write_lock, self._conn:
+                # Delete heart rate data
+                self._conn.execute("DELETE FROM heart_rate WHERE ring_id = ?", (ring_id,))
+                
+                # Delete steps data
+                self._conn.execute("DELETE FROM steps WHERE ring_id = ?", (ring_id,))
+                
+                # Delete battery data
+                self._conn.execute("DELETE FROM battery WHERE ring_id = ?", (ring_id,))
+                
+                # Delete the daily rollups
+                self._conn.execute("DELETE FROM heart_rate_daily WHERE ring_id = ?", (ring_id,))
+                self._conn.execute("DELETE FROM steps_daily WHERE ring_id = ?", (ring_id,))
+                
+                # Delete the ring
+                self._conn.execute("DELETE FROM rings WHERE id = ?", (ring_id,))
             
-            logger.info(f"Removed ring with ID {ring_id}")
+            logger.info("Removed ring with ID %s", ring_id)
             return True
         except Exception as e:
-            # Rollback in case of error
-            conn.rollback()
-            logger.error(f"Error removing ring {ring_id}: {e}")
+            logger.error("Error removing ring %s: %s", ring_id, e)
             return False
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
 
     def add_or_update_ring(self, mac_address: str, name: Optional[str] = None) -> int:
         """Add a new ring or update an existing one."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Check if ring exists
-            cursor.execute("SELECT id FROM rings WHERE mac_address = ?", (mac_address,))
-            result = cursor.fetchone()
-            
-            if result:
-                # Update existing ring
-                if name:
-                    cursor.execute(
-                        "UPDATE rings SET name = ?, last_connected = CURRENT_TIMESTAMP WHERE id = ?",
-                        (name, result['id'])
-                    )
+            # The lookup runs under the write lock so the ring cannot be
+            # added by another writer between it and the insert
+            with self._write_lock, self._conn:
+                # Check if ring exists
+                result = self._conn.execute("SELECT id FROM rings WHERE mac_address = ?", (mac_address,)).fetchone()
+                
+                if result:
+                    # Update existing ring
+                    if name:
+                        self._conn.execute(
+                            "UPDATE rings SET name = ?, last_connected = CURRENT_TIMESTAMP WHERE id = ?",
+                            (name, result['id'])
+                        )
+                    else:
+                        self._conn.execute(
+                            "UPDATE rings SET last_connected = CURRENT_TIMESTAMP WHERE id = ?",
+                            (result['id'],)
+                        )
+                    return result['id']
                 else:
-                    cursor.execute(
-                        "UPDATE rings SET last_connected = CURRENT_TIMESTAMP WHERE id = ?",
-                        (result['id'],)
+                    # Add new ring
+                    cursor = self._conn.execute(
+                        "INSERT INTO rings (mac_address, name, last_connected) VALUES (?, ?, CURRENT_TIMESTAMP)",
+                        (mac_address, name or f"Ring {mac_address[-5:]}")
                     )
-                conn.commit()
-                return result['id']
-            else:
-                # Add new ring
-                cursor.execute(
-                    "INSERT INTO rings (mac_address, name, last_connected) VALUES (?, ?, CURRENT_TIMESTAMP)",
-                    (mac_address, name or f"Ring {mac_address[-5:]}")
-                )
-                conn.commit()
-                return cursor.lastrowid
+                    return cursor.lastrowid
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
 
     def get_daily_heart_rate_stats(self, ring_id: int, days: int = 30) -> List[Dict[str, Any]]:
-        """Get daily heart rate statistics for the last N days."""
-        start_date = datetime.datetime.now() - datetime.timedelta(days=days)
+        """Get daily heart rate statistics for the last N days from the heart_rate_daily rollup.
         
-        conn = get_db_connection()
+        Days are whole UTC calendar days, like the stored timestamps: the
+        result covers today and the N days before it.
+        """
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT 
-                date(timestamp) as date,
-                MIN(value) as min_value,
-                MAX(value) as max_value,
-                AVG(value) as avg_value,
-                COUNT(*) as count
-            FROM heart_rate
-            WHERE ring_id = ? AND timestamp >= ?
-            GROUP BY date(timestamp)
+                date,
+                min_value,
+                max_value,
+                CAST(sum_value AS REAL) / count as avg_value,
+                count
+            FROM heart_rate_daily
+            WHERE ring_id = ? AND date >= date('now', ?)
             ORDER BY date DESC
-        """, (ring_id, start_date))
+        """, (ring_id, f'-{days} days'))
         
         result = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        self._release_connection(conn)
         
         return result
 
     def get_daily_steps_stats(self, ring_id: int, days: int = 30) -> List[Dict[str, Any]]:
-        """Get daily steps statistics for the last N days."""
-        start_date = datetime.datetime.now() - datetime.timedelta(days=days)
+        """Get daily steps statistics for the last N days from the steps_daily rollup.
         
-        conn = get_db_connection()
+        Days are whole UTC calendar days, as in get_daily_heart_rate_stats.
+        """
+        conn = self._thread_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT 
-                date(timestamp) as date,
-                MAX(value) as max_value
-            FROM steps
-            WHERE ring_id = ? AND timestamp >= ?
-            GROUP BY date(timestamp)
+            SELECT date, max_value
+            FROM steps_daily
+            WHERE ring_id = ? AND date >= date('now', ?)
             ORDER BY date DESC
-        """, (ring_id, start_date))
+        """, (ring_id, f'-{days} days'))
         
         result = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        self._release_connection(conn)
         
         return result
 
     def update_ring_battery(self, ring_id: int, battery_level: int) -> None:
         """Update the battery level for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "UPDATE rings SET battery_level = ?, last_connected = CURRENT_TIMESTAMP WHERE id = ?",
-                (battery_level, ring_id)
-            )
-            conn.commit()
-            logger.debug(f"Updated battery level for ring {ring_id} to {battery_level}%")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "UPDATE rings SET battery_level = ?, last_connected = CURRENT_TIMESTAMP WHERE id = ?",
+                    (battery_level, ring_id)
+                )
+            self.invalidate_ring_cache()
+            logger.debug("Updated battery level for ring %s to %s%%", ring_id, battery_level)
         except Exception as e:
-            logger.error(f"Error updating battery level for ring {ring_id}: {e}")
+            logger.error("Error updating battery level for ring %s: %s", ring_id, e)
+            
+    def rename_ring(self, ring_id: int, name: str) -> None:
+        """Change the display name of a ring."""
+        try:
+            with self._write_lock, self._conn:
+                self._conn.execute("UPDATE rings SET name = ? WHERE id = ?", (name, ring_id))
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
+        logger.info("Renamed ring %s to %s", ring_id, name)
             
     def update_ring_mock_status(self, ring_id: int, is_mock: bool) -> None:
         """Update the mock status for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "UPDATE rings SET is_mock = ? WHERE id = ?",
-                (1 if is_mock else 0, ring_id)
-            )
-            conn.commit()
-            logger.info(f"Updated mock status for ring {ring_id} to {is_mock}")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "UPDATE rings SET is_mock = ? WHERE id = ?",
+                    (1 if is_mock else 0, ring_id)
+                )
+            logger.info("Updated mock status for ring %s to %s", ring_id, is_mock)
         except Exception as e:
-            logger.error(f"Error updating mock status for ring {ring_id}: {e}")
+            logger.error("Error updating mock status for ring %s: %s", ring_id, e)
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
             
     def update_last_sync(self, ring_id: int) -> None:
         """Update the last sync timestamp for a ring."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "UPDATE rings SET last_sync = CURRENT_TIMESTAMP WHERE id = ?",
-                (ring_id,)
-            )
-            conn.commit()
-            logger.info(f"Updated last sync time for ring {ring_id}")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "UPDATE rings SET last_sync = CURRENT_TIMESTAMP WHERE id = ?",
+                    (ring_id,)
+                )
+            logger.info("Updated last sync time for ring %s", ring_id)
         except Exception as e:
-            logger.error(f"Error updating last sync time for ring {ring_id}: {e}")
+            logger.error("Error updating last sync time for ring %s: %s", ring_id, e)
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
 
     def add_heart_rate_with_timestamp(self, ring_id: int, value: int, timestamp: datetime.datetime) -> None:
         """Add a heart rate reading with a specific timestamp."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO heart_rate (ring_id, value, timestamp) VALUES (?, ?, ?)",
-                (ring_id, value, timestamp)
-            )
-            conn.commit()
-            logger.debug(f"Added heart rate {value} for ring {ring_id} at {timestamp}")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO heart_rate (ring_id, value, timestamp) VALUES (?, ?, ?)",
+                    (ring_id, value, timestamp)
+                )
+            logger.debug("Added heart rate %s for ring %s at %s", value, ring_id, timestamp)
         except Exception as e:
-            logger.error(f"Error adding heart rate for ring {ring_id}: {e}")
-        finally:
-            conn.close()
+            logger.error("Error adding heart rate for ring %s: %s", ring_id, e)
             
     def add_steps_with_timestamp(self, ring_id: int, value: int, timestamp: datetime.datetime) -> None:
         """Add a steps reading with a specific timestamp."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO steps (ring_id, value, timestamp) VALUES (?, ?, ?)",
-                (ring_id, value, timestamp)
-            )
-            conn.commit()
-            logger.debug(f"Added steps {value} for ring {ring_id} at {timestamp}")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO steps (ring_id, value, timestamp) VALUES (?, ?, ?)",
+                    (ring_id, value, timestamp)
+                )
+            logger.debug("Added steps %s for ring %s at %s", value, ring_id, timestamp)
         except Exception as e:
-            logger.error(f"Error adding steps for ring {ring_id}: {e}")
-        finally:
-            conn.close()
+            logger.error("Error adding steps for ring %s: %s", ring_id, e)
+            
+    def add_heart_rate_bulk(self, ring_id: int, rows: List[Tuple[int, datetime.datetime]]) -> None:
+        """Add many (value, timestamp) heart rate readings in a single transaction."""
+        try:
+            with self._write_lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO heart_rate (ring_id, value, timestamp) VALUES (?, ?, ?)",
+                    [(ring_id, value, timestamp) for value, timestamp in rows]
+                )
+            logger.debug("Added %s heart rate readings for ring %s", len(rows), ring_id)
+        except Exception as e:
+            logger.error("Error adding heart rate readings for ring %s: %s", ring_id, e)
+            
+    def add_steps_bulk(self, ring_id: int, rows: List[Tuple[int, datetime.datetime]]) -> None:
+        """Add many (value, timestamp) steps readings in a single transaction."""
+        try:
+            with self._write_lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO steps (ring_id, value, timestamp) VALUES (?, ?, ?)",
+                    [(ring_id, value, timestamp) for value, timestamp in rows]
+                )
+            logger.debug("Added %s steps readings for ring %s", len(rows), ring_id)
+        except Exception as e:
+            logger.error("Error adding steps readings for ring %s: %s", ring_id, e)
             
     def add_battery_with_timestamp(self, ring_id: int, value: int, timestamp: datetime.datetime) -> None:
         """Add a battery reading with a specific timestamp."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO battery (ring_id, value, timestamp) VALUES (?, ?, ?)",
-                (ring_id, value, timestamp)
-            )
-            conn.commit()
-            logger.debug(f"Added battery {value}% for ring {ring_id} at {timestamp}")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO battery (ring_id, value, timestamp) VALUES (?, ?, ?)",
+                    (ring_id, value, timestamp)
+                )
+            logger.debug("Added battery %s%% for ring %s at %s", value, ring_id, timestamp)
         except Exception as e:
-            logger.error(f"Error adding battery for ring {ring_id}: {e}")
-        finally:
-            conn.close()
+            logger.error("Error adding battery for ring %s: %s", ring_id, e)
 
     def update_ring(self, ring_id: int, data: Dict[str, Any]) -> None:
         """Update ring data with the provided dictionary."""
         if not data:
             return
             
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
             # Build the SET part of the SQL query
             set_parts = []
@@ -520,30 +759,26 @@ class Database:
             values.append(ring_id)
             
             # Execute the update query
-            cursor.execute(
-                f"UPDATE rings SET {', '.join(set_parts)} WHERE id = ?",
-                values
-            )
-            conn.commit()
-            logger.info(f"Updated ring {ring_id} with data: {data}")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    f"UPDATE rings SET {', '.join(set_parts)} WHERE id = ?",
+                    values
+                )
+            logger.info("Updated ring %s with data: %s", ring_id, data)
         except Exception as e:
-            logger.error(f"Error updating ring {ring_id}: {e}")
+            logger.error("Error updating ring %s: %s", ring_id, e)
         finally:
-            conn.close()
+            self.invalidate_ring_cache()
 
     def update_ring_disconnection(self, ring_id):
-        """Update the database when a ring is disconnected."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
+        """Update the last_disconnected timestamp for a ring."""
         try:
-            cursor.execute(
-                "UPDATE rings SET connected = 0, last_disconnected = CURRENT_TIMESTAMP WHERE id = ?",
-                (ring_id,)
-            )
-            conn.commit()
-            logger.info(f"Updated connection status for ring {ring_id} to disconnected")
+            with self._write_lock, self._conn:
+                self._conn.execute(
+                    "UPDATE rings SET last_disconnected = CURRENT_TIMESTAMP WHERE id = ?",
+                    (ring_id,)
+                )
+            self.invalidate_ring_cache()
+            logger.info("Updated last_disconnected for ring %s", ring_id)
         except Exception as e:
-            logger.error(f"Error updating disconnection status for ring {ring_id}: {e}")
-        finally:
-            conn.close() 
\ No newline at end of file
+            logger.error("Error updating disconnection status for ring %s: %s", ring_id, e) 
\ No newline at end of file
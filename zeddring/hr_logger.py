@@ -5,16 +5,10 @@ import logging
 import threading
 from typing import Dict, Optional
 import datetime
-import asyncio
 
-from zeddring.database import Database
-from zeddring.ring_manager import RingManager
+from zeddring.database import Database, row_get
+from zeddring.ring_manager import RingManager, RING_OPERATION_TIMEOUT
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("zeddring.hr_logger")
 
 class HeartRateLogger:
@@ -54,70 +48,58 @@ class HeartRateLogger:
                 for ring in rings:
                     try:
                         # Get ring data
-                        ring_data = self.ring_manager.get_ring_data(ring['id'])
+                        ring_data = self.ring_manager.get_ring_summary(ring['id'])
                         
                         # Check if the ring is connected
                         if not ring_data.get('connected', False):
-                            logger.debug(f"Ring {ring['id']} is not connected, skipping data logging")
+                            logger.debug("Ring %s is not connected, skipping data logging", ring['id'])
                             continue
                             
                         # Get the client for this ring
-                        mac_address = ring['mac_address'] if 'mac_address' in ring.keys() else None
-                        if not mac_address or mac_address not in self.ring_manager.clients:
-                            logger.debug(f"No client found for ring {ring['id']}, skipping data logging")
+                        mac_address = row_get(ring, 'mac_address')
+                        client = self.ring_manager.get_client(mac_address) if mac_address else None
+                        if client is None:
+                            logger.debug("No client found for ring %s, skipping data logging", ring['id'])
                             continue
                             
-                        client = self.ring_manager.clients[mac_address]
                         
-                        # Create a new event loop for this ring
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
+                        # Client calls run on the ring manager's event loop
+                        call_client = self.ring_manager.call_client
                         
                         # Get heart rate directly from the client
                         try:
-                            heart_rate = loop.run_until_complete(client.get_heart_rate())
+                            heart_rate = call_client(client, 'get_heart_rate', RING_OPERATION_TIMEOUT)
                             if heart_rate and heart_rate > 0:
                                 self.db.add_heart_rate(ring['id'], heart_rate)
-                                logger.info(f"Logged heart rate {heart_rate} for ring {ring['id']}")
+                                logger.info("Logged heart rate %s for ring %s", heart_rate, ring['id'])
                         except Exception as e:
-                            logger.error(f"Error getting heart rate for ring {ring['id']}: {e}")
+                            logger.error("Error getting heart rate for ring %s: %s", ring['id'], e)
                             
-                        # Get steps directly from the client - properly handle async method
+                        # Get steps directly from the client
                         try:
-                            # Check if get_steps is a coroutine function
-                            if asyncio.iscoroutinefunction(client.get_steps):
-                                steps = loop.run_until_complete(client.get_steps())
-                            else:
-                                steps = client.get_steps()
-                                
+                            steps = call_client(client, 'get_steps', RING_OPERATION_TIMEOUT)
                             if steps and steps > 0:
                                 self.db.add_steps(ring['id'], steps)
-                                logger.info(f"Logged steps {steps} for ring {ring['id']}")
+                                logger.info("Logged steps %s for ring %s", steps, ring['id'])
                         except Exception as e:
-                            logger.error(f"Error getting steps for ring {ring['id']}: {e}")
+                            logger.error("Error getting steps for ring %s: %s", ring['id'], e)
                             
-                        # Get battery directly from the client - properly handle async method
+                        # Get battery directly from the client
                         try:
-                            # Check if get_battery is a coroutine function
-                            if asyncio.iscoroutinefunction(client.get_battery):
-                                battery = loop.run_until_complete(client.get_battery())
-                            else:
-                                battery = client.get_battery()
-                                
+                            battery = call_client(client, 'get_battery', RING_OPERATION_TIMEOUT)
                             if battery is not None:
                                 self.db.add_battery(ring['id'], battery)
-                                logger.info(f"Logged battery {battery}% for ring {ring['id']}")
+                                logger.info("Logged battery %s%% for ring %s", battery, ring['id'])
                         except Exception as e:
-                            logger.error(f"Error getting battery for ring {ring['id']}: {e}")
-                            
-                        # Close the loop
-                        loop.close()
+                            logger.error("Error getting battery for ring %s: %s", ring['id'], e)
+                        
+                        self.ring_manager.notify_ring_updated(ring['id'])
                     except Exception as e:
-                        logger.error(f"Error logging data for ring {ring['id']}: {e}")
+                        logger.error("Error logging data for ring %s: %s", ring['id'], e)
                         
                 # Sleep before next log
                 time.sleep(self.interval)
                 
             except Exception as e:
-                logger.error(f"Error in logger loop: {e}")
+                logger.error("Error in logger loop: %s", e)
                 time.sleep(10)  # Short delay before retrying
@@ -4,90 +4,81 @@ import time
 import logging
 import threading
 import asyncio
+import importlib
+import inspect
 from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime
 import json
 import os
 import sqlite3
 from dataclasses import dataclass
-import re
+import functools
+import concurrent.futures
+from collections import defaultdict
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("zeddring.ring_manager")
 
-# Try to import the colmi_r02_client package
+# Use uvloop for the manager's event loop when it is installed; the
+# process-wide event loop policy is left alone
 try:
-    # Try different possible class names
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Candidate locations for the Colmi client class, in order of preference
+_COLMI_CLIENT_CANDIDATES = [
+    ("colmi_r02_client", "Client"),
+    ("colmi_r02_client", "ColmiR02Client"),
+    ("colmi_r02_client", "ColmiClient"),
+    ("colmi_r02_client.client", "Client"),
+    ("colmi_r02_client.client", "ColmiR02Client"),
+    ("colmi_r02_client.client", "ColmiClient"),
+    ("colmi_r02_client.custom_client", "Client"),
+]
+
+# Try to import the colmi_r02_client package
+ColmiClient = None
+COLMI_CLIENT_AVAILABLE = False
+for _module_name, _class_name in _COLMI_CLIENT_CANDIDATES:
     try:
-        from colmi_r02_client import Client as ColmiClient
+        ColmiClient = getattr(importlib.import_module(_module_name), _class_name)
         COLMI_CLIENT_AVAILABLE = True
-    except ImportError:
-        try:
-            from colmi_r02_client import ColmiR02Client as ColmiClient
-            COLMI_CLIENT_AVAILABLE = True
-        except ImportError:
-            try:
-                from colmi_r02_client import ColmiClient
+        break
+    except (ImportError, AttributeError):
+        continue
+else:
+    # Try to dynamically find a client class in the package
+    try:
+        import colmi_r02_client
+        
+        # Find all classes in the module
+        client_classes = [obj for name, obj in inspect.getmembers(colmi_r02_client)
+                          if inspect.isclass(obj) and obj.__module__ == 'colmi_r02_client']
+        
+        # Look for a class that might be a client
+        for cls in client_classes:
+            if any(name in cls.__name__.lower() for name in ['client', 'colmi', 'ring']):
+                ColmiClient = cls
                 COLMI_CLIENT_AVAILABLE = True
-            except ImportError:
-                try:
-                    # Try importing from submodules
-                    from colmi_r02_client.client import Client as ColmiClient
-                    COLMI_CLIENT_AVAILABLE = True
-                except ImportError:
-                    try:
-                        from colmi_r02_client.client import ColmiR02Client as ColmiClient
-                        COLMI_CLIENT_AVAILABLE = True
-                    except ImportError:
-                        try:
-                            from colmi_r02_client.client import ColmiClient
-                            COLMI_CLIENT_AVAILABLE = True
-                        except ImportError:
-                            try:
-                                # Try importing from custom_client
-                                from colmi_r02_client.custom_client import Client as ColmiClient
-                                COLMI_CLIENT_AVAILABLE = True
-                            except ImportError:
-                                # Try to dynamically find a client class in the package
-                                try:
-                                    import colmi_r02_client
-                                    import inspect
-                                    
-                                    # Find all classes in the module
-                                    client_classes = [obj for name, obj in inspect.getmembers(colmi_r02_client) 
-                                                    if inspect.isclass(obj) and obj.__module__ == 'colmi_r02_client']
-                                    
-                                    # Look for a class that might be a client
-                                    for cls in client_classes:
-                                        if any(name in cls.__name__.lower() for name in ['client', 'colmi', 'ring']):
-                                            ColmiClient = cls
-                                            COLMI_CLIENT_AVAILABLE = True
-                                            logger.info(f"Found potential client class: {cls.__name__}")
-                                            break
-                                    else:
-                                        COLMI_CLIENT_AVAILABLE = False
-                                        logger.warning("No suitable client class found in colmi_r02_client")
-                                except Exception as e:
-                                    COLMI_CLIENT_AVAILABLE = False
-                                    logger.warning(f"Error finding client class: {e}")
-except ImportError:
-    logger.warning("colmi_r02_client not available, using mock client")
-    COLMI_CLIENT_AVAILABLE = False
-    ColmiClient = None
+                logger.info("Found potential client class: %s", cls.__name__)
+                break
+        else:
+            logger.warning("No suitable client class found in colmi_r02_client")
+    except ImportError:
+        logger.warning("colmi_r02_client not available, using mock client")
+    except Exception as e:
+        logger.warning("Error finding client class: %s", e)
 
 # Import our custom scanner
-from zeddring.scanner import scan_for_devices, MockColmiR02Client
+from zeddring.scanner import scan_for_devices, watch_for_devices, MockColmiR02Client, RING_NAME_PATTERN, MAC_ADDRESS_PATTERN
 
 # Import database functions
-from zeddring.database import Database, get_db_connection
+from zeddring.database import Database, get_db_connection, row_get
 
 # Import config
 try:
-    from zeddring.config import SCAN_INTERVAL, SCAN_TIMEOUT, MAX_RETRY_ATTEMPTS, RETRY_DELAY, PERSISTENT_CONNECTION
+    from zeddring.config import SCAN_INTERVAL, SCAN_TIMEOUT, MAX_RETRY_ATTEMPTS, RETRY_DELAY, PERSISTENT_CONNECTION, BLE_MAX_CONCURRENT
 except ImportError:
     # Default values if config is not available
     SCAN_INTERVAL = 20
@@ -95,6 +86,81 @@ except ImportError:
     MAX_RETRY_ATTEMPTS = 3
     RETRY_DELAY = 300
     PERSISTENT_CONNECTION = True
+    BLE_MAX_CONCURRENT = 3
+
+def _parse_timestamp(timestamp):
+    """Convert a history entry timestamp to a datetime if needed."""
+    if isinstance(timestamp, str):
+        try:
+            # fromisoformat also accepts the "%Y-%m-%d %H:%M:%S" form the
+            # rings report, so strptime is only reached for malformed values
+            return datetime.fromisoformat(timestamp)
+        except ValueError:
+            # Try different format if isoformat fails
+            return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+    return timestamp
+
+def _history_rows(entries) -> List[tuple]:
+    """Build (value, timestamp) rows from history entries, skipping incomplete ones."""
+    rows = []
+    append = rows.append
+    parse = _parse_timestamp
+    for entry in entries or ():
+        timestamp = entry.get('timestamp')
+        value = entry.get('value')
+        if timestamp and value:
+            append((value, parse(timestamp)))
+    return rows
+
+def _link_is_up(client) -> bool:
+    """Check whether a client still reports an open BLE link.
+    
+    Clients that expose no connection state are assumed to be connected.
+    """
+    connected = getattr(client, 'connected', None)
+    if connected is None:
+        bleak_client = getattr(client, 'bleak_client', None)
+        connected = getattr(bleak_client, 'is_connected', True)
+    return bool(connected)
+
+async def _call(method, *args):
+    """Call a client method, awaiting the result if the method is async."""
+    result = method(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+async def _acquire_off_loop(lock):
+    """Acquire a threading lock or semaphore without blocking the event loop.
+    
+    If the waiting task is cancelled, the executor thread still gets the lock
+    eventually; it is then released straight away instead of being leaked.
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+    try:
+        await asyncio.shield(future)
+    except asyncio.CancelledError:
+        def release(f):
+            if not f.cancelled() and f.exception() is None:
+                lock.release()
+        future.add_done_callback(release)
+        raise
+
+def _locked_by_mac(method):
+    """Serialize calls to a RingManager method for the same MAC address."""
+    @functools.wraps(method)
+    def wrapper(self, mac_address, *args, **kwargs):
+        with self._mac_lock(mac_address):
+            return method(self, mac_address, *args, **kwargs)
+    return wrapper
+
+# How long callers wait for a ring operation on the manager's event loop
+RING_OPERATION_TIMEOUT = 30
+# How long the ring list is reused before re-reading it from the database
+RINGS_CACHE_TTL = 60
+STATUS_CACHE_TTL = 2.0
+# Fields included in get_ring_status_columnar, one list per field
+STATUS_COLUMNS = ('id', 'name', 'mac_address', 'connected', 'heart_rate', 'steps', 'battery', 'last_sync')
 
 class Ring:
     """Represents a smart ring device."""
@@ -128,7 +194,7 @@ class Ring:
         try:
             # Check if ColmiClient is available
             if not COLMI_CLIENT_AVAILABLE:
-                logger.error(f"ColmiClient not available, cannot connect to {self.name} ({self.mac_address})")
+                logger.error("ColmiClient not available, cannot connect to %s (%s)", self.name, self.mac_address)
                 return False
                 
             # Create a new client
@@ -138,15 +204,15 @@ class Ring:
             connected = await self.client.connect()
             
             if connected:
-                logger.info(f"Connected to {self.name} ({self.mac_address})")
+                logger.info("Connected to %s (%s)", self.name, self.mac_address)
                 self.connected = True
                 return True
             else:
-                logger.error(f"Failed to connect to {self.name} ({self.mac_address})")
+                logger.error("Failed to connect to %s (%s)", self.name, self.mac_address)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error connecting to {self.name} ({self.mac_address}): {e}")
+            logger.error("Error connecting to %s (%s): %s", self.name, self.mac_address, e)
             return False
             
     async def disconnect(self):
@@ -158,16 +224,16 @@ class Ring:
             if self.client:
                 await self.client.disconnect()
             self.connected = False
-            logger.info(f"Disconnected from ring {self.mac_address}")
+            logger.info("Disconnected from ring %s", self.mac_address)
             return True
         except Exception as e:
-            logger.error(f"Error disconnecting from ring {self.mac_address}: {e}")
+            logger.error("Error disconnecting from ring %s: %s", self.mac_address, e)
             return False
             
     async def get_heart_rate(self):
         """Get heart rate from the ring."""
         if not self.connected:
-            logger.warning(f"Ring {self.mac_address} is not connected")
+            logger.warning("Ring %s is not connected", self.mac_address)
             return None
             
         try:
@@ -176,13 +242,13 @@ class Ring:
             self.last_updated = datetime.now()
             return heart_rate
         except Exception as e:
-            logger.error(f"Error getting heart rate from ring {self.mac_address}: {e}")
+            logger.error("Error getting heart rate from ring %s: %s", self.mac_address, e)
             return None
             
     async def get_steps(self):
         """Get steps from the ring."""
         if not self.connected:
-            logger.warning(f"Ring {self.mac_address} is not connected")
+            logger.warning("Ring %s is not connected", self.mac_address)
             return None
             
         try:
@@ -191,13 +257,13 @@ class Ring:
             self.last_updated = datetime.now()
             return steps
         except Exception as e:
-            logger.error(f"Error getting steps from ring {self.mac_address}: {e}")
+            logger.error("Error getting steps from ring %s: %s", self.mac_address, e)
             return None
             
     async def get_battery(self):
         """Get battery level from the ring."""
         if not self.connected:
-            logger.warning(f"Ring {self.mac_address} is not connected")
+            logger.warning("Ring %s is not connected", self.mac_address)
             return None
             
         try:
@@ -206,7 +272,7 @@ class Ring:
             self.last_updated = datetime.now()
             return battery
         except Exception as e:
-            logger.error(f"Error getting battery from ring {self.mac_address}: {e}")
+            logger.error("Error getting battery from ring %s: %s", self.mac_address, e)
             return None
             
     async def update_all(self):
@@ -221,129 +287,90 @@ class Ring:
             # Get battery
             battery = await self.get_battery()
             
-            # Sync historical data if available
-            await self.sync_historical_data()
-            
             return {
                 'heart_rate': heart_rate,
                 'steps': steps,
                 'battery': battery
             }
         except Exception as e:
-            logger.error(f"Error updating data for ring {self.id}: {e}")
+            logger.error("Error updating data for ring %s: %s", self.id, e)
             return None
             
-    async def sync_historical_data(self):
-        """Sync historical data from the ring."""
-        if not self.client or not hasattr(self.client, 'get_historical_data'):
-            logger.error(f"Client for ring {self.id} does not support get_historical_data")
-            return False
-            
-        try:
-            logger.info(f"Syncing historical data for ring {self.id}")
-            historical_data = await self.client.get_historical_data()
-            
-            if not historical_data:
-                logger.warning(f"No historical data returned for ring {self.id}")
-                return False
-                
-            logger.info(f"Received historical data: {historical_data}")
-            
-            synced_data = False
-            
-            if historical_data and 'steps_history' in historical_data:
-                steps_count = 0
-                for entry in historical_data['steps_history']:
-                    timestamp = entry.get('timestamp')
-                    steps = entry.get('value')
-                    if timestamp and steps:
-                        # Convert timestamp to datetime if needed
-                        if isinstance(timestamp, str):
-                            timestamp = datetime.fromisoformat(timestamp)
-                        # Add to database with specific timestamp
-                        self.db.add_steps_with_timestamp(self.id, steps, timestamp)
-                        steps_count += 1
-                logger.info(f"Synced {steps_count} steps entries for ring {self.id}")
-                if steps_count > 0:
-                    synced_data = True
-                        
-            if historical_data and 'heart_rate_history' in historical_data:
-                hr_count = 0
-                for entry in historical_data['heart_rate_history']:
-                    timestamp = entry.get('timestamp')
-                    heart_rate = entry.get('value')
-                    if timestamp and heart_rate:
-                        # Convert timestamp to datetime if needed
-                        if isinstance(timestamp, str):
-                            timestamp = datetime.fromisoformat(timestamp)
-                        # Add to database with specific timestamp
-                        self.db.add_heart_rate_with_timestamp(self.id, heart_rate, timestamp)
-                        hr_count += 1
-                logger.info(f"Synced {hr_count} heart rate entries for ring {self.id}")
-                if hr_count > 0:
-                    synced_data = True
-            
-            # Update the last sync time in the database
-            if synced_data:
-                self.db.update_last_sync(self.id)
-                logger.info(f"Historical data sync completed for ring {self.id}")
-                return True
-            else:
-                logger.warning(f"No data was synced for ring {self.id}")
-                return False
-        except Exception as e:
-            logger.error(f"Error syncing historical data for ring {self.id}: {e}")
-            return False
-            
     async def set_ring_time(self):
         """Set the time on the ring."""
         if not self.connected:
-            logger.error(f"Ring {self.name} ({self.mac_address}) is not connected")
+            logger.error("Ring %s (%s) is not connected", self.name, self.mac_address)
             return False
             
         if not self.client:
-            logger.error(f"No client available for ring {self.name} ({self.mac_address})")
+            logger.error("No client available for ring %s (%s)", self.name, self.mac_address)
             return False
             
         try:
             current_time = datetime.now()
             await self.client.set_time(current_time)
-            logger.info(f"Set time on ring {self.name} ({self.mac_address}) to {current_time}")
+            logger.info("Set time on ring %s (%s) to %s", self.name, self.mac_address, current_time)
             return True
         except Exception as e:
-            logger.error(f"Error setting time on ring {self.name} ({self.mac_address}): {e}")
+            logger.error("Error setting time on ring %s (%s): %s", self.name, self.mac_address, e)
             return False
             
     async def reboot(self):
         """Reboot the ring."""
         if not self.connected:
-            logger.error(f"Ring {self.name} ({self.mac_address}) is not connected")
+            logger.error("Ring %s (%s) is not connected", self.name, self.mac_address)
             return False
             
         if not self.client:
-            logger.error(f"No client available for ring {self.name} ({self.mac_address})")
+            logger.error("No client available for ring %s (%s)", self.name, self.mac_address)
             return False
             
         try:
             await self.client.reboot()
-            logger.info(f"Rebooted ring {self.name} ({self.mac_address})")
+            logger.info("Rebooted ring %s (%s)", self.name, self.mac_address)
             return True
         except Exception as e:
-            logger.error(f"Error rebooting ring {self.name} ({self.mac_address}): {e}")
+            logger.error("Error rebooting ring %s (%s): %s", self.name, self.mac_address, e)
             return False
 
+@dataclass
+class ClientRecord:
+    """A ring client tracked by the manager and its connection state."""
+    client: Any
+    connected: bool = False
+    last_ok_ts: float = 0.0
+
 class RingManager:
     """Manager for Colmi R02 rings."""
 
     def __init__(self, db: Optional[Database] = None):
         """Initialize the ring manager."""
         self.db = db or Database()
-        self.clients = {}
+        self.records: Dict[str, ClientRecord] = {}
         self.running = False
         self.scanner_thread = None
         self.data_thread = None
-        self.connected_rings = {}
         self.lock = threading.Lock()
+        # Per-MAC locks so only one connection attempt per ring is in flight
+        self._mac_locks = defaultdict(threading.Lock)
+        # Limits simultaneous BLE connects so they don't saturate the adapter
+        self._ble_sem = threading.BoundedSemaphore(BLE_MAX_CONCURRENT)
+        self._rings_cache = None
+        self._rings_cache_ts = 0.0
+        # (timestamp, result) of the last get_ring_status call
+        self._status_cache = (0.0, None)
+        self._pending_adverts = set()
+        self._advert_handled_at = {}
+        # Set to run the next data collection cycle without waiting out SCAN_INTERVAL
+        self._wake = threading.Event()
+        # Bumped whenever new readings are stored for a ring; see wait_for_ring_update
+        self._ring_versions = defaultdict(int)
+        self._ring_updated = threading.Condition()
+        
+        # Persistent event loop that runs every coroutine the manager issues
+        self._loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._loop_thread.start()
 
     def start(self) -> None:
         """Start the ring manager."""
@@ -363,255 +390,396 @@ class RingManager:
     def stop(self) -> None:
         """Stop the ring manager."""
         self.running = False
+        self._wake.set()
         logger.info("Ring manager stopped")
 
+    def shutdown(self) -> None:
+        """Stop the ring manager and its event loop thread."""
+        self.stop()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+
+    def _run_loop(self) -> None:
+        """Run the manager's event loop until shutdown."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _run(self, coro):
+        """Run a coroutine on the manager's event loop and wait for the result.
+        
+        Must not be called from the event loop thread itself.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def run_coroutine(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the manager's event loop from another thread.
+        
+        Lets callers such as web requests reuse the loop that owns the BLE
+        clients instead of creating their own. The coroutine is cancelled if
+        it has not finished after timeout seconds.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def call_client(self, client, method: str, timeout: Optional[float] = RING_OPERATION_TIMEOUT):
+        """Call a client method by name on the manager's event loop and return its result.
+        
+        Sync and async client methods are both supported. Raises TimeoutError
+        if the call has not finished after timeout seconds.
+        """
+        return self.run_coroutine(_call(getattr(client, method)), timeout)
+
+    def poll_now(self) -> None:
+        """Wake the data collection loop so it polls rings right away."""
+        self._wake.set()
+
+    def _mac_lock(self, mac_address: str) -> threading.Lock:
+        """Get the lock serializing connection attempts for a MAC address."""
+        with self.lock:
+            return self._mac_locks[mac_address]
+
+    def get_client(self, mac_address: str):
+        """Get the client tracked for a MAC address, if any."""
+        record = self.records.get(mac_address)
+        return record.client if record is not None else None
+
+    def is_connected(self, mac_address: str) -> bool:
+        """Check whether a MAC address has a connected client."""
+        record = self.records.get(mac_address)
+        return record is not None and record.connected
+
+    def _store_client(self, mac_address: str, client) -> None:
+        """Register a connected client for a MAC address."""
+        with self.lock:
+            self.records[mac_address] = ClientRecord(client, connected=True, last_ok_ts=time.monotonic())
+        self.invalidate_status_cache()
+
+    def _drop_client(self, mac_address: str):
+        """Forget the client for a MAC address, returning it if there was one."""
+        with self.lock:
+            record = self.records.pop(mac_address, None)
+        self.invalidate_status_cache()
+        return record.client if record is not None else None
+
+    async def _poll_one(self, client) -> tuple:
+        """Read heart rate, steps and battery from a connected client.
+        
+        Failed reads are returned as the exception instead of raising.
+        """
+        return await asyncio.gather(
+            _call(client.get_heart_rate),
+            _call(client.get_steps),
+            _call(client.get_battery),
+            return_exceptions=True
+        )
+
+    def _cached_rings(self, ttl: float = RINGS_CACHE_TTL) -> List:
+        """Get all rings, re-reading the database only when the cache is stale."""
+        now = time.monotonic()
+        if self._rings_cache is None or now - self._rings_cache_ts > ttl:
+            self._rings_cache = self.db.get_rings()
+            self._rings_cache_ts = now
+        return self._rings_cache
+
+    def invalidate_rings_cache(self) -> None:
+        """Force the next ring list lookup to hit the database."""
+        self._rings_cache = None
+        self.invalidate_status_cache()
+
+    def invalidate_status_cache(self) -> None:
+        """Force the next get_ring_status call to recompute."""
+        self._status_cache = (0.0, None)
+
+    def notify_ring_updated(self, ring_id: int) -> None:
+        """Wake everyone waiting in wait_for_ring_update for this ring."""
+        with self._ring_updated:
+            self._ring_versions[ring_id] += 1
+            self._ring_updated.notify_all()
+
+    def wait_for_ring_update(self, ring_id: int, version: int, timeout: float) -> int:
+        """Wait until the ring's readings move past version, or timeout seconds pass.
+        
+        Returns the ring's current version; pass it back in to wait for the
+        next update. Pass None with a timeout of 0 to read the current version.
+        """
+        with self._ring_updated:
+            # get() so that waiting on a ring never adds an entry for it
+            self._ring_updated.wait_for(lambda: self._ring_versions.get(ring_id, 0) != version, timeout)
+            return self._ring_versions.get(ring_id, 0)
+
     def _scanner_loop(self) -> None:
-        """Continuously scan for and connect to rings."""
+        """Watch for ring advertisements, falling back to periodic scans."""
+        try:
+            logger.info("Watching for ring advertisements...")
+            self._run(watch_for_devices(self._on_advert, lambda: self.running))
+        except Exception as e:
+            logger.warning("Advertisement watching unavailable, falling back to periodic scans: %s", e)
+        
         while self.running:
             try:
-                # Scan for devices
+                # Scan for devices, finishing early once every known ring
+                # that isn't connected yet has been seen
                 logger.info("Scanning for devices...")
-                # Create a new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+                targets = {ring['mac_address'] for ring in self._cached_rings()
+                           if ring['mac_address'] not in self.records}
+                devices = self._run(scan_for_devices(timeout=10, target_addresses=targets or None))
                 
-                # Run the coroutine and get the result
-                devices = loop.run_until_complete(scan_for_devices(timeout=10))
-                loop.close()
-                
-                logger.info(f"Found {len(devices)} devices")
+                logger.info("Found %s devices", len(devices))
                 
                 # Process found devices
                 for device in devices:
                     if not self.running:
                         break
-                        
-                    try:
-                        # Check if this is a ring we're interested in
-                        if "Colmi" in device.name or "R02" in device.name:
-                            logger.info(f"Found ring: {device.name} ({device.address})")
-                            
-                            # Add to database if not already there
-                            ring = self.db.get_ring_by_mac(device.address)
-                            if not ring:
-                                ring_id = self.db.add_ring(device.name, device.address)
-                                logger.info(f"Added new ring with ID {ring_id}")
-                            else:
-                                ring_id = ring['id']
-                                logger.info(f"Ring already in database with ID {ring_id}")
-                            
-                            # Connect to the ring if not already connected
-                            if device.address not in self.clients and PERSISTENT_CONNECTION:
-                                self._connect_to_ring(device.address, ring_id)
-                            elif not PERSISTENT_CONNECTION:
-                                # Connect, get data, and disconnect
-                                self._connect_and_get_data(device.address, ring_id)
-                    except Exception as e:
-                        logger.error(f"Error processing device {device.name}: {e}")
+                    self._handle_found_device(device)
                 
                 # Sleep before next scan
                 time.sleep(SCAN_INTERVAL)
                 
             except Exception as e:
-                logger.error(f"Error in scanner loop: {e}")
+                logger.error("Error in scanner loop: %s", e)
                 time.sleep(10)  # Short delay before retrying
 
+    def _on_advert(self, device: Dict[str, Any]) -> None:
+        """Handle a device advertisement without blocking the scanner's event loop."""
+        name = device.get('name')
+        if not name or RING_NAME_PATTERN.search(name) is None:
+            return
+        
+        address = device['address']
+        now = time.monotonic()
+        with self.lock:
+            # Rings advertise several times a second, so only act on one
+            # advertisement per device every SCAN_INTERVAL
+            if address in self.records or address in self._pending_adverts:
+                return
+            if now - self._advert_handled_at.get(address, float('-inf')) < SCAN_INTERVAL:
+                return
+            self._pending_adverts.add(address)
+            self._advert_handled_at[address] = now
+        
+        asyncio.get_running_loop().run_in_executor(None, self._handle_advert, device)
+
+    def _handle_advert(self, device: Dict[str, Any]) -> None:
+        """Process an advertised device on a worker thread."""
+        try:
+            self._handle_found_device(device)
+        finally:
+            with self.lock:
+                self._pending_adverts.discard(device['address'])
+
+    def _handle_found_device(self, device: Dict[str, Any]) -> None:
+        """Register a discovered ring and connect to it."""
+        # Check if this is a ring we're interested in
+        name = device.get('name')
+        if not name or RING_NAME_PATTERN.search(name) is None:
+            return
+        
+        address = device['address']
+        try:
+            logger.info("Found ring: %s (%s)", name, address)
+            
+            # Add to database if not already there
+            ring = self.db.get_ring_by_mac(address)
+            if not ring:
+                ring_id = self.db.add_ring(name, address)
+                self.invalidate_rings_cache()
+                logger.info("Added new ring with ID %s", ring_id)
+            else:
+                ring_id = ring['id']
+                logger.info("Ring already in database with ID %s", ring_id)
+            
+            # Connect to the ring if not already connected
+            if address not in self.records and PERSISTENT_CONNECTION:
+                if self._connect_to_ring(address, ring_id):
+                    self.poll_now()
+            elif not PERSISTENT_CONNECTION:
+                # Connect, get data, and disconnect
+                self._connect_and_get_data(address, ring_id)
+        except Exception as e:
+            logger.error("Error processing device %s: %s", name, e)
+
     def _data_collection_loop(self) -> None:
         """Collect data from connected rings."""
         while self.running:
             try:
-                # Get all rings from the database
-                rings = self.db.get_rings()
+                # Get all rings, reusing the cached list while it is fresh
+                rings = self._cached_rings()
                 
                 for ring in rings:
                     ring_id = ring['id']
                     mac_address = ring['mac_address']
                     
+                    # Keep the connection open between polls; only reconnect
+                    # when the ring dropped the link or a poll failed
+                    client = self.get_client(mac_address)
+                    if client is not None and not _link_is_up(client):
+                        logger.info("Lost connection to ring %s (%s)", ring_id, mac_address)
+                        self._drop_client(mac_address)
+                        client = None
+                    
                     # Check if we should connect to this ring
-                    if mac_address not in self.clients:
+                    if client is None and PERSISTENT_CONNECTION:
                         # Try to connect to the ring
-                        if PERSISTENT_CONNECTION:
-                            logger.info(f"Attempting to connect to ring {ring_id} ({mac_address})")
-                            connected = self._connect_to_ring(mac_address, ring_id)
-                            if connected:
-                                # Set the time on the ring after connecting
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                loop.run_until_complete(self.clients[mac_address].set_ring_time())
-                                loop.close()
+                        logger.info("Attempting to connect to ring %s (%s)", ring_id, mac_address)
+                        connected = self._connect_to_ring(mac_address, ring_id)
+                        if connected:
+                            client = self.get_client(mac_address)
+                            # Set the time on the ring after connecting
+                            self._run(client.set_ring_time())
                     
                     # If the ring is connected, get data
-                    if mac_address in self.clients:
+                    if client is not None:
                         try:
-                            # Create a new event loop for this ring
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            
                             # Get data from the ring
-                            client = self.clients[mac_address]
+                            heart_rate, steps, battery = self._run(self._poll_one(client))
+                            readings = {}
                             
                             # Get heart rate
-                            try:
-                                heart_rate = loop.run_until_complete(client.get_heart_rate())
-                                if heart_rate and heart_rate > 0:
-                                    self.db.add_heart_rate(ring_id, heart_rate)
-                                    logger.debug(f"Added heart rate {heart_rate} for ring {ring_id}")
-                            except Exception as e:
-                                logger.error(f"Error getting heart rate: {e}")
+                            if isinstance(heart_rate, Exception):
+                                logger.error("Error getting heart rate: %s", heart_rate)
+                            elif heart_rate and heart_rate > 0:
+                                readings['heart_rate'] = heart_rate
                             
                             # Get steps
-                            try:
-                                steps = client.get_steps()
-                                if steps and steps > 0:
-                                    self.db.add_steps(ring_id, steps)
-                                    logger.debug(f"Added steps {steps} for ring {ring_id}")
-                            except Exception as e:
-                                logger.error(f"Error getting steps: {e}")
+                            if isinstance(steps, Exception):
+                                logger.error("Error getting steps: %s", steps)
+                            elif steps and steps > 0:
+                                readings['steps'] = steps
                             
                             # Get battery
-                            try:
-                                battery = client.get_battery()
-                                if battery is not None:
-                                    self.db.add_battery(ring_id, battery)
-                                    self.db.update_ring_battery(ring_id, battery)
-                                    logger.debug(f"Added battery {battery}% for ring {ring_id}")
-                            except Exception as e:
-                                logger.error(f"Error getting battery: {e}")
+                            if isinstance(battery, Exception):
+                                logger.error("Error getting battery: %s", battery)
+                            elif battery is not None:
+                                readings['battery'] = battery
                             
-                            # Close the loop
-                            loop.close()
+                            # Store everything collected this cycle in one transaction
+                            if readings:
+                                self.db.add_readings(ring_id, **readings)
+                                self.invalidate_status_cache()
+                                self.notify_ring_updated(ring_id)
+                                record = self.records.get(mac_address)
+                                if record is not None:
+                                    record.last_ok_ts = time.monotonic()
                             
                         except Exception as e:
-                            logger.error(f"Error getting data from ring {ring_id}: {e}")
+                            logger.error("Error getting data from ring %s: %s", ring_id, e)
                             
                             # Disconnect if there was an error
-                            if mac_address in self.clients:
-                                try:
-                                    loop = asyncio.new_event_loop()
-                                    asyncio.set_event_loop(loop)
-                                    loop.run_until_complete(self.clients[mac_address].disconnect())
-                                    loop.close()
-                                except Exception as disconnect_error:
-                                    logger.error(f"Error disconnecting from ring {ring_id}: {disconnect_error}")
-                                finally:
-                                    if mac_address in self.clients:
-                                        del self.clients[mac_address]
+                            try:
+                                self._run(client.disconnect())
+                            except Exception as disconnect_error:
+                                logger.error("Error disconnecting from ring %s: %s", ring_id, disconnect_error)
+                            finally:
+                                self._drop_client(mac_address)
                 
-                # Sleep before next collection
-                time.sleep(SCAN_INTERVAL)
+                # Wait for the next collection, or until something wakes us
+                self._wake.wait(SCAN_INTERVAL)
+                self._wake.clear()
                 
             except Exception as e:
-                logger.error(f"Error in data collection loop: {e}")
+                logger.error("Error in data collection loop: %s", e)
                 time.sleep(10)  # Short delay before retrying
 
+    @_locked_by_mac
     def _connect_to_ring(self, mac_address: str, ring_id: int) -> bool:
         """Connect to a ring and keep the connection open."""
         try:
             # Get ring info from database
             ring_info = self.db.get_ring(ring_id)
             if not ring_info:
-                logger.error(f"Ring {ring_id} not found in database")
+                logger.error("Ring %s not found in database", ring_id)
                 return False
             
-            # Handle sqlite3.Row objects which don't have a get method
-            ring_name = ring_info['name'] if 'name' in ring_info.keys() else 'Unknown Ring'
-            is_mock = ring_info['is_mock'] if 'is_mock' in ring_info.keys() else 0
+            ring_name = row_get(ring_info, 'name', 'Unknown Ring')
+            is_mock = row_get(ring_info, 'is_mock', 0)
             
             # Check if already connected
-            if mac_address in self.clients:
+            client = self.get_client(mac_address)
+            if client is not None:
                 # Check if the connection is still valid
-                client = self.clients[mac_address]
-                if hasattr(client, 'connected') and client.connected:
-                    logger.info(f"Already connected to {mac_address}")
+                if getattr(client, 'connected', False):
+                    logger.info("Already connected to %s", mac_address)
                     return True
                 else:
                     # Connection is no longer valid, remove it and reconnect
-                    logger.info(f"Connection to {mac_address} is no longer valid, reconnecting...")
+                    logger.info("Connection to %s is no longer valid, reconnecting...", mac_address)
                     try:
                         # Try to disconnect cleanly
                         if hasattr(client, 'disconnect'):
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            loop.run_until_complete(client.disconnect())
-                            loop.close()
+                            self._run(client.disconnect())
                     except Exception as e:
-                        logger.warning(f"Error disconnecting from {mac_address}: {e}")
+                        logger.warning("Error disconnecting from %s: %s", mac_address, e)
                     
                     # Remove the client
-                    del self.clients[mac_address]
-                    if mac_address in self.connected_rings:
-                        del self.connected_rings[mac_address]
+                    self._drop_client(mac_address)
             
             # Check if this is a valid MAC address (should be in format like 00:11:22:33:44:55)
-            is_valid_mac = bool(re.match(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$', mac_address))
+            is_valid_mac = bool(MAC_ADDRESS_PATTERN.match(mac_address))
             
             # If it's not a valid MAC or marked as mock, use the mock client
             if not is_valid_mac or is_mock:
-                logger.warning(f"Using mock client for {ring_name} ({mac_address}) - Valid MAC: {is_valid_mac}, Is Mock: {is_mock}")
+                logger.warning("Using mock client for %s (%s) - Valid MAC: %s, Is Mock: %s", ring_name, mac_address, is_valid_mac, is_mock)
                 client = MockColmiR02Client(mac_address)
                 
                 # For mock client, simulate connection
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                connected = loop.run_until_complete(client.connect())
-                loop.close()
+                with self._ble_sem:
+                    connected = self._run(client.connect())
                 
                 if connected:
-                    logger.info(f"Connected to mock ring {ring_name} ({mac_address})")
-                    self.clients[mac_address] = client
-                    self.connected_rings[mac_address] = True
+                    logger.info("Connected to mock ring %s (%s)", ring_name, mac_address)
+                    self._store_client(mac_address, client)
                     self.db.update_ring_connection(ring_id)
                     return True
                 else:
-                    logger.error(f"Failed to connect to mock ring {ring_name} ({mac_address})")
+                    logger.error("Failed to connect to mock ring %s (%s)", ring_name, mac_address)
                     return False
             
             # Check if ColmiClient is available for real connections
             if not COLMI_CLIENT_AVAILABLE:
-                logger.error(f"ColmiClient not available, cannot connect to real ring {ring_name} ({mac_address})")
+                logger.error("ColmiClient not available, cannot connect to real ring %s (%s)", ring_name, mac_address)
                 return False
             
             # Use real client for real MAC addresses
-            logger.info(f"Using real ColmiClient for {ring_name} ({mac_address})")
+            logger.info("Using real ColmiClient for %s (%s)", ring_name, mac_address)
             try:
                 client = ColmiClient(mac_address)
             except Exception as e:
-                logger.error(f"Error creating ColmiClient: {e}")
+                logger.error("Error creating ColmiClient: %s", e)
                 return False
             
             # Connect
             connected = False
             
-            # Create a new event loop for the connection
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
             try:
-                connected = loop.run_until_complete(client.connect())
+                with self._ble_sem:
+                    connected = self._run(client.connect())
             except Exception as e:
-                logger.error(f"Error connecting to ring: {e}")
+                logger.error("Error connecting to ring: %s", e)
                 connected = False
-            finally:
-                loop.close()
             
             if connected:
-                logger.info(f"Connected to real ring {ring_name} ({mac_address})")
-                self.clients[mac_address] = client
-                self.connected_rings[mac_address] = True
+                logger.info("Connected to real ring %s (%s)", ring_name, mac_address)
+                self._store_client(mac_address, client)
                 self.db.update_ring_connection(ring_id)
                 return True
             else:
-                logger.error(f"Failed to connect to real ring {ring_name} ({mac_address})")
+                logger.error("Failed to connect to real ring %s (%s)", ring_name, mac_address)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error connecting to ring: {e}")
+            logger.error("Error connecting to ring: %s", e)
             return False
 
+    @_locked_by_mac
     def _connect_and_get_data(self, mac_address: str, ring_id: int) -> None:
         """Connect to a ring, get data, and disconnect."""
         # Skip if already connected
-        if mac_address in self.clients:
-            logger.info(f"Already connected to {mac_address}")
+        if mac_address in self.records:
+            logger.info("Already connected to %s", mac_address)
             return
             
         try:
@@ -620,149 +788,158 @@ class RingManager:
                 try:
                     client = ColmiClient(mac_address)
                 except Exception as e:
-                    logger.error(f"Error creating ColmiClient: {e}")
+                    logger.error("Error creating ColmiClient: %s", e)
                     client = MockColmiR02Client(mac_address)
             else:
                 client = MockColmiR02Client(mac_address)
                 
-            self.clients[mac_address] = client
+            with self.lock:
+                self.records[mac_address] = ClientRecord(client)
             
             # Connect
-            logger.info(f"Connecting to {mac_address}...")
+            logger.info("Connecting to %s...", mac_address)
             
-            # For the mock client, we need to handle the async connect differently
-            if COLMI_CLIENT_AVAILABLE:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                connected = loop.run_until_complete(client.connect())
-                loop.close()
-            else:
-                # For mock client, simulate async
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                connected = loop.run_until_complete(client.connect())
-                loop.close()
+            with self._ble_sem:
+                connected = self._run(client.connect())
                 
             if connected:
-                logger.info(f"Connected to {mac_address}")
+                logger.info("Connected to %s", mac_address)
                 self.db.update_ring_connection(ring_id)
+                stored = False
                 
                 # Get battery
                 try:
-                    if COLMI_CLIENT_AVAILABLE:
-                        battery = client.get_battery()
-                    else:
-                        battery = client.get_battery()
-                    logger.info(f"Battery: {battery}%")
+                    battery = self._run(_call(client.get_battery))
+                    logger.info("Battery: %s%%", battery)
                     self.db.add_battery(ring_id, battery)
+                    stored = True
                     
                     # Update the ring's battery level in the database
                     self.db.update_ring_battery(ring_id, battery)
                 except Exception as e:
-                    logger.error(f"Error getting battery: {e}")
+                    logger.error("Error getting battery: %s", e)
                 
                 # Get steps
                 try:
-                    if COLMI_CLIENT_AVAILABLE:
-                        steps = client.get_steps()
-                    else:
-                        steps = client.get_steps()
-                    logger.info(f"Steps: {steps}")
+                    steps = self._run(_call(client.get_steps))
+                    logger.info("Steps: %s", steps)
                     self.db.add_steps(ring_id, steps)
+                    stored = True
                 except Exception as e:
-                    logger.error(f"Error getting steps: {e}")
+                    logger.error("Error getting steps: %s", e)
                 
                 # Get heart rate
                 try:
-                    if COLMI_CLIENT_AVAILABLE:
-                        heart_rates = client.get_real_time_heart_rate()
-                    else:
-                        heart_rates = client.get_real_time_heart_rate()
-                        
+                    heart_rates = self._run(_call(client.get_real_time_heart_rate))
                     if heart_rates and len(heart_rates) > 0:
                         # Use the last (most recent) heart rate value
                         hr_value = heart_rates[-1]
                         if hr_value > 0:  # Ignore zero values
-                            logger.info(f"Heart rate: {hr_value}")
+                            logger.info("Heart rate: %s", hr_value)
                             self.db.add_heart_rate(ring_id, hr_value)
+                            stored = True
                 except Exception as e:
-                    logger.error(f"Error getting heart rate: {e}")
+                    logger.error("Error getting heart rate: %s", e)
+                
+                if stored:
+                    self.invalidate_status_cache()
+                    self.notify_ring_updated(ring_id)
                 
                 # Disconnect
-                logger.info(f"Disconnecting from {mac_address}...")
-                if COLMI_CLIENT_AVAILABLE:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(client.disconnect())
-                    loop.close()
-                else:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(client.disconnect())
-                    loop.close()
+                logger.info("Disconnecting from %s...", mac_address)
+                self._run(client.disconnect())
                 
-                logger.info(f"Disconnected from {mac_address}")
+                logger.info("Disconnected from %s", mac_address)
             else:
-                logger.error(f"Failed to connect to {mac_address}")
+                logger.error("Failed to connect to %s", mac_address)
                 
         except Exception as e:
-            logger.error(f"Error connecting to {mac_address}: {e}")
+            logger.error("Error connecting to %s: %s", mac_address, e)
         finally:
             # Clean up
-            if mac_address in self.clients:
-                del self.clients[mac_address]
+            self._drop_client(mac_address)
 
     def get_ring_status(self) -> List[Dict]:
-        """Get status of all rings."""
-        rings = self.db.get_rings()
+        """Get status of all rings.
+        
+        The result is cached for STATUS_CACHE_TTL seconds so repeated web
+        requests don't re-run the status queries.
+        """
+        cached_at, cached = self._status_cache
+        if cached is not None and time.monotonic() - cached_at < STATUS_CACHE_TTL:
+            return cached
+        
+        rings = self.db.get_ring_dicts()
         result = []
         
-        for ring in rings:
-            # Convert to dict for easier manipulation
-            ring_dict = dict(ring)
+        # Latest reading of every metric for all rings in one query
+        try:
+            latest = self.db.get_latest_metrics_all_rings()
+        except Exception as e:
+            logger.error("Error getting latest ring data: %s", e)
+            latest = {'heart_rate': {}, 'steps': {}, 'battery': {}}
+        latest_hr = latest['heart_rate']
+        latest_steps = latest['steps']
+        latest_battery = latest['battery']
+        
+        records = self.records
+        for ring_dict in rings:
+            ring_id = ring_dict['id']
             
             # Add connected status
-            ring_dict['connected'] = ring['mac_address'] in self.clients
+            ring_dict['connected'] = ring_dict['mac_address'] in records
             
-            # Get latest data
-            try:
-                heart_rate_data = self.db.get_heart_rate_data(ring['id'], limit=1)
-                if heart_rate_data:
-                    ring_dict['heart_rate'] = heart_rate_data[0]['value']
-                    ring_dict['heart_rate_time'] = heart_rate_data[0]['timestamp']
-                
-                steps_data = self.db.get_steps_data(ring['id'], limit=1)
-                if steps_data:
-                    ring_dict['steps'] = steps_data[0]['value']
-                    ring_dict['steps_time'] = steps_data[0]['timestamp']
-                
-                battery_data = self.db.get_battery_data(ring['id'], limit=1)
-                if battery_data:
-                    ring_dict['battery'] = battery_data[0]['value']
-                    ring_dict['battery_time'] = battery_data[0]['timestamp']
-                
-                # Get last sync time (most recent data point)
-                last_sync = None
-                if heart_rate_data and steps_data:
-                    hr_time = heart_rate_data[0]['timestamp']
-                    steps_time = steps_data[0]['timestamp']
-                    last_sync = max(hr_time, steps_time)
-                elif heart_rate_data:
-                    last_sync = heart_rate_data[0]['timestamp']
-                elif steps_data:
-                    last_sync = steps_data[0]['timestamp']
-                
-                if last_sync:
-                    ring_dict['last_sync'] = last_sync
-            except Exception as e:
-                logger.error(f"Error getting data for ring {ring['id']}: {e}")
+            heart_rate_data = latest_hr.get(ring_id)
+            if heart_rate_data:
+                ring_dict['heart_rate'] = heart_rate_data['value']
+                ring_dict['heart_rate_time'] = heart_rate_data['timestamp']
+            
+            steps_data = latest_steps.get(ring_id)
+            if steps_data:
+                ring_dict['steps'] = steps_data['value']
+                ring_dict['steps_time'] = steps_data['timestamp']
+            
+            battery_data = latest_battery.get(ring_id)
+            if battery_data:
+                ring_dict['battery'] = battery_data['value']
+                ring_dict['battery_time'] = battery_data['timestamp']
+            
+            # Get last sync time (most recent data point)
+            last_sync = None
+            if heart_rate_data and steps_data:
+                last_sync = max(heart_rate_data['timestamp'], steps_data['timestamp'])
+            elif heart_rate_data:
+                last_sync = heart_rate_data['timestamp']
+            elif steps_data:
+                last_sync = steps_data['timestamp']
+            
+            if last_sync:
+                ring_dict['last_sync'] = last_sync
             
             result.append(ring_dict)
         
+        self._status_cache = (time.monotonic(), result)
         return result
 
-    def get_ring_data(self, ring_id: int) -> Dict:
-        """Get detailed data for a specific ring."""
+    def get_ring_status_columnar(self) -> Dict[str, List]:
+        """Get the status of all rings as parallel lists keyed by field name.
+        
+        Each list has one entry per ring, in the same order, with None for
+        missing values. This avoids repeating every key for every ring.
+        """
+        rings = self.get_ring_status()
+        return {field: [ring.get(field) for ring in rings] for field in STATUS_COLUMNS}
+
+    def get_ring_summary(self, ring_id: int) -> Dict:
+        """Get a ring's connection status and latest values without the history series."""
+        return self.get_ring_data(ring_id, include_series=False)
+
+    def get_ring_data(self, ring_id: int, include_series: bool = True) -> Dict:
+        """Get detailed data for a specific ring.
+        
+        With include_series=False only the latest reading of each metric is
+        read, and the *_data lists and heart rate stats are left out.
+        """
         ring = self.db.get_ring(ring_id)
         if not ring:
             return {}
@@ -771,42 +948,46 @@ class RingManager:
         result = dict(ring)
         
         # Add connected status
-        result['connected'] = ring['mac_address'] in self.clients
+        result['connected'] = ring['mac_address'] in self.records
         
         # Get data
+        limit = 100 if include_series else 1
         try:
             # Get heart rate data
-            heart_rate_data = self.db.get_heart_rate_data(ring_id, limit=100)
-            result['heart_rate_data'] = [
-                {'value': row['value'], 'timestamp': row['timestamp']}
-                for row in heart_rate_data
-            ]
-            
-            # Calculate min, max, avg heart rate
+            heart_rate_data = self.db.get_heart_rate_data(ring_id, limit=limit)
+            if include_series:
+                result['heart_rate_data'] = [
+                    {'value': row['value'], 'timestamp': row['timestamp']}
+                    for row in heart_rate_data
+                ]
+            
+            # Calculate min, max, avg heart rate over the same readings
+            if heart_rate_data and include_series:
+                stats = self.db.get_heart_rate_stats(ring_id, limit=100)
+                if stats:
+                    result['min_heart_rate'], result['max_heart_rate'], result['avg_heart_rate'] = stats
             if heart_rate_data:
-                hr_values = [row['value'] for row in heart_rate_data]
-                result['min_heart_rate'] = min(hr_values)
-                result['max_heart_rate'] = max(hr_values)
-                result['avg_heart_rate'] = sum(hr_values) / len(hr_values)
                 result['latest_heart_rate'] = heart_rate_data[0]['value']
             
             # Get steps data
-            steps_data = self.db.get_steps_data(ring_id, limit=100)
-            result['steps_data'] = [
-                {'value': row['value'], 'timestamp': row['timestamp']}
-                for row in steps_data
-            ]
+            steps_data = self.db.get_steps_data(ring_id, limit=limit)
+            if include_series:
+                result['steps_data'] = [
+                    {'value': row['value'], 'timestamp': row['timestamp']}
+                    for row in steps_data
+                ]
             
             # Get latest steps
             if steps_data:
                 result['latest_steps'] = steps_data[0]['value']
             
             # Get battery data
-            battery_data = self.db.get_battery_data(ring_id, limit=100)
-            result['battery_data'] = [
-                {'value': row['value'], 'timestamp': row['timestamp']}
-                for row in battery_data
-            ]
+            battery_data = self.db.get_battery_data(ring_id, limit=limit)
+            if include_series:
+                result['battery_data'] = [
+                    {'value': row['value'], 'timestamp': row['timestamp']}
+                    for row in battery_data
+                ]
             
             # Get latest battery
             if battery_data:
@@ -818,7 +999,7 @@ class RingManager:
                 result['last_seen'] = result['last_connected']
                 
         except Exception as e:
-            logger.error(f"Error getting data for ring {ring_id}: {e}")
+            logger.error("Error getting data for ring %s: %s", ring_id, e)
         
         return result
         
@@ -830,21 +1011,20 @@ class RingManager:
                 return False
                 
             # Disconnect if connected
-            if ring['mac_address'] in self.clients:
+            client = self.get_client(ring['mac_address'])
+            if client is not None:
                 try:
-                    client = self.clients[ring['mac_address']]
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(client.disconnect())
-                    loop.close()
-                    del self.clients[ring['mac_address']]
+                    self._run(client.disconnect())
+                    self._drop_client(ring['mac_address'])
                 except Exception as e:
-                    logger.error(f"Error disconnecting from ring {ring_id}: {e}")
+                    logger.error("Error disconnecting from ring %s: %s", ring_id, e)
             
             # Remove from database
-            return self.db.remove_ring(ring_id)
+            removed = self.db.remove_ring(ring_id)
+            self.invalidate_rings_cache()
+            return removed
         except Exception as e:
-            logger.error(f"Error removing ring {ring_id}: {e}")
+            logger.error("Error removing ring %s: %s", ring_id, e)
             return False
             
     async def connect_ring(self, ring_id: int) -> bool:
@@ -853,42 +1033,58 @@ class RingManager:
             # Get ring info from database
             ring_info = self.db.get_ring(ring_id)
             if not ring_info:
-                logger.error(f"Ring {ring_id} not found in database")
+                logger.error("Ring %s not found in database", ring_id)
                 return False
             
-            # Handle sqlite3.Row objects which don't have a get method
-            mac_address = ring_info['mac_address'] if 'mac_address' in ring_info.keys() else None
-            ring_name = ring_info['name'] if 'name' in ring_info.keys() else 'Unknown Ring'
+            mac_address = row_get(ring_info, 'mac_address')
+            ring_name = row_get(ring_info, 'name', 'Unknown Ring')
             
             if not mac_address:
-                logger.error(f"Ring {ring_id} has no MAC address")
+                logger.error("Ring %s has no MAC address", ring_id)
                 return False
                 
-            logger.info(f"Attempting to connect to ring {ring_id} ({mac_address})")
+            logger.info("Attempting to connect to ring %s (%s)", ring_id, mac_address)
             
             # Check if ColmiClient is available
             if not COLMI_CLIENT_AVAILABLE:
-                logger.error(f"ColmiClient not available, cannot connect to {ring_name} ({mac_address})")
+                logger.error("ColmiClient not available, cannot connect to %s (%s)", ring_name, mac_address)
                 return False
                 
-            # Create a temporary Ring object to connect
-            temp_ring = Ring(ring_id, ring_name, mac_address)
-            
-            # Connect using the Ring object
-            connected = await temp_ring.connect()
-            
-            if connected:
-                # Store the client
-                self.clients[mac_address] = temp_ring.client
-                self.connected_rings[mac_address] = True
-                self.db.update_ring_connection(ring_id)
-                return True
-            else:
-                logger.error(f"Failed to connect to ring {ring_id} ({mac_address})")
-                return False
+            # Only one connection attempt per ring at a time, shared with the
+            # background connector. Like the semaphore below, the lock is also
+            # held by threads waiting on this loop, so acquire it off the loop.
+            mac_lock = self._mac_lock(mac_address)
+            await _acquire_off_loop(mac_lock)
+            try:
+                # A request that waited on the lock finds the ring connected
+                if self.is_connected(mac_address):
+                    logger.info("Already connected to %s", mac_address)
+                    return True
+                
+                # Create a temporary Ring object to connect
+                temp_ring = Ring(ring_id, ring_name, mac_address)
+                
+                # Connect using the Ring object
+                await _acquire_off_loop(self._ble_sem)
+                try:
+                    connected = await temp_ring.connect()
+                finally:
+                    self._ble_sem.release()
+                
+                if connected:
+                    # Store the client
+                    self._store_client(mac_address, temp_ring.client)
+                    self.db.update_ring_connection(ring_id)
+                    self.poll_now()
+                    return True
+                else:
+                    logger.error("Failed to connect to ring %s (%s)", ring_id, mac_address)
+                    return False
+            finally:
+                mac_lock.release()
                 
         except Exception as e:
-            logger.error(f"Error connecting to ring {ring_id}: {e}")
+            logger.error("Error connecting to ring %s: %s", ring_id, e)
             return False
             
     async def disconnect_ring(self, ring_id: int) -> bool:
@@ -896,47 +1092,40 @@ class RingManager:
         try:
             ring = self.db.get_ring(ring_id)
             if not ring:
-                logger.error(f"Ring {ring_id} not found in database")
+                logger.error("Ring %s not found in database", ring_id)
                 return False
                 
-            mac_address = ring['mac_address'] if 'mac_address' in ring.keys() else None
+            mac_address = row_get(ring, 'mac_address')
             if not mac_address:
-                logger.error(f"Ring {ring_id} has no MAC address")
+                logger.error("Ring %s has no MAC address", ring_id)
                 return False
                 
             # Skip if not connected
-            if mac_address not in self.clients:
-                logger.info(f"Ring {ring_id} ({mac_address}) is not connected")
+            client = self.get_client(mac_address)
+            if client is None:
+                logger.info("Ring %s (%s) is not connected", ring_id, mac_address)
                 return True
                 
             # Disconnect
-            client = self.clients[mac_address]
-            logger.info(f"Disconnecting from ring {ring_id} ({mac_address})...")
+            logger.info("Disconnecting from ring %s (%s)...", ring_id, mac_address)
             
             try:
-                # Check if disconnect is a coroutine function
-                if asyncio.iscoroutinefunction(client.disconnect):
-                    await client.disconnect()
-                else:
-                    # For non-async disconnect methods
-                    client.disconnect()
+                await _call(client.disconnect)
                 
-                logger.info(f"Successfully disconnected from ring {ring_id} ({mac_address})")
+                logger.info("Successfully disconnected from ring %s (%s)", ring_id, mac_address)
             except Exception as e:
-                logger.error(f"Error during disconnect operation: {e}")
+                logger.error("Error during disconnect operation: %s", e)
                 # Continue with cleanup even if disconnect fails
             
-            # Remove from clients and update database
-            del self.clients[mac_address]
-            if mac_address in self.connected_rings:
-                del self.connected_rings[mac_address]
+            # Forget the client and update database
+            self._drop_client(mac_address)
             
             # Update connection status in database
             self.db.update_ring_disconnection(ring_id)
             
             return True
         except Exception as e:
-            logger.error(f"Error disconnecting from ring {ring_id}: {e}")
+            logger.error("Error disconnecting from ring %s: %s", ring_id, e)
             return False
             
     def get_ring_history(self, ring_id: int, days: int = 7) -> Dict:
@@ -946,7 +1135,7 @@ class RingManager:
             # return self.db.get_ring_history(ring_id, days)
             return {}
         except Exception as e:
-            logger.error(f"Error getting ring history for {ring_id}: {e}")
+            logger.error("Error getting ring history for %s: %s", ring_id, e)
             return {}
             
     def get_daily_data(self, ring_id: int, date: Optional[str] = None) -> Dict:
@@ -956,24 +1145,24 @@ class RingManager:
             # return self.db.get_daily_data(ring_id, date)
             return {}
         except Exception as e:
-            logger.error(f"Error getting daily data for {ring_id}: {e}")
+            logger.error("Error getting daily data for %s: %s", ring_id, e)
             return {}
             
     def save_ring_data(self, ring_id: int, data: Dict) -> bool:
         """Save ring data to database."""
         try:
-            if 'heart_rate' in data and data['heart_rate']:
-                self.db.add_heart_rate(ring_id, data['heart_rate'])
-                
-            if 'steps' in data and data['steps']:
-                self.db.add_steps(ring_id, data['steps'])
-                
-            if 'battery' in data and data['battery']:
-                self.db.add_battery(ring_id, data['battery'])
-                
+            # Write all readings in one transaction, skipping empty values
+            self.db.add_readings(
+                ring_id,
+                heart_rate=data.get('heart_rate') or None,
+                steps=data.get('steps') or None,
+                battery=data.get('battery') or None
+            )
+            self.invalidate_status_cache()
+            self.notify_ring_updated(ring_id)
             return True
         except Exception as e:
-            logger.error(f"Error saving ring data for {ring_id}: {e}")
+            logger.error("Error saving ring data for %s: %s", ring_id, e)
             return False
 
     async def reboot_ring(self, ring_id: int) -> bool:
@@ -982,52 +1171,43 @@ class RingManager:
             # Get ring info from database
             ring_info = self.db.get_ring(ring_id)
             if not ring_info:
-                logger.error(f"Ring {ring_id} not found in database")
+                logger.error("Ring %s not found in database", ring_id)
                 return False
             
-            # Handle sqlite3.Row objects which don't have a get method
-            mac_address = ring_info['mac_address'] if 'mac_address' in ring_info.keys() else None
-            ring_name = ring_info['name'] if 'name' in ring_info.keys() else 'Unknown Ring'
+            mac_address = row_get(ring_info, 'mac_address')
+            ring_name = row_get(ring_info, 'name', 'Unknown Ring')
             
             if not mac_address:
-                logger.error(f"Ring {ring_id} has no MAC address")
+                logger.error("Ring %s has no MAC address", ring_id)
                 return False
                 
             # Check if the ring is connected
-            if mac_address not in self.clients:
-                logger.error(f"Ring {ring_id} ({mac_address}) is not connected")
+            client = self.get_client(mac_address)
+            if client is None:
+                logger.error("Ring %s (%s) is not connected", ring_id, mac_address)
                 return False
                 
-            # Get the client
-            client = self.clients[mac_address]
-            logger.info(f"Rebooting ring {ring_id} ({mac_address})...")
+            logger.info("Rebooting ring %s (%s)...", ring_id, mac_address)
             
             # Reboot the ring
             try:
-                # Check if reboot is a coroutine function
-                if asyncio.iscoroutinefunction(client.reboot):
-                    await client.reboot()
-                else:
-                    # For non-async reboot methods
-                    client.reboot()
+                await _call(client.reboot)
                 
-                logger.info(f"Successfully rebooted ring {ring_id} ({mac_address})")
+                logger.info("Successfully rebooted ring %s (%s)", ring_id, mac_address)
                 
-                # Remove from clients since connection will be lost after reboot
-                del self.clients[mac_address]
-                if mac_address in self.connected_rings:
-                    del self.connected_rings[mac_address]
+                # Forget the client since connection will be lost after reboot
+                self._drop_client(mac_address)
                 
                 # Update connection status in database
                 self.db.update_ring_disconnection(ring_id)
                 
                 return True
             except Exception as e:
-                logger.error(f"Error during reboot operation: {e}")
+                logger.error("Error during reboot operation: %s", e)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error rebooting ring {ring_id}: {e}")
+            logger.error("Error rebooting ring %s: %s", ring_id, e)
             return False
 
     async def sync_historical_data_for_ring(self, ring_id: int) -> bool:
@@ -1036,122 +1216,99 @@ class RingManager:
             # Get ring info from database
             ring_info = self.db.get_ring(ring_id)
             if not ring_info:
-                logger.error(f"Ring {ring_id} not found in database")
+                logger.error("Ring %s not found in database", ring_id)
                 return False
             
-            # Handle sqlite3.Row objects which don't have a get method
-            mac_address = ring_info['mac_address'] if 'mac_address' in ring_info.keys() else None
-            ring_name = ring_info['name'] if 'name' in ring_info.keys() else 'Unknown Ring'
+            mac_address = row_get(ring_info, 'mac_address')
+            ring_name = row_get(ring_info, 'name', 'Unknown Ring')
             
             if not mac_address:
-                logger.error(f"Ring {ring_id} has no MAC address")
+                logger.error("Ring %s has no MAC address", ring_id)
                 return False
                 
             # Check if the ring is connected
-            if mac_address not in self.clients:
-                logger.error(f"Ring {ring_id} ({mac_address}) is not connected, attempting to connect...")
+            client = self.get_client(mac_address)
+            if client is None:
+                logger.error("Ring %s (%s) is not connected, attempting to connect...", ring_id, mac_address)
                 # Try to connect to the ring first
                 connected = await self.connect_ring(ring_id)
                 if not connected:
-                    logger.error(f"Failed to connect to ring {ring_id} ({mac_address})")
+                    logger.error("Failed to connect to ring %s (%s)", ring_id, mac_address)
                     return False
+                client = self.get_client(mac_address)
             
-            # Get the client
-            client = self.clients[mac_address]
-            logger.info(f"Syncing historical data for ring {ring_id} ({mac_address})...")
+            logger.info("Syncing historical data for ring %s (%s)...", ring_id, mac_address)
             
             # Check if the client supports get_historical_data
             if not hasattr(client, 'get_historical_data'):
-                logger.error(f"Client for ring {ring_id} does not support get_historical_data")
+                logger.error("Client for ring %s does not support get_historical_data", ring_id)
                 return False
             
             # Sync historical data
             try:
                 # Get historical data
-                if asyncio.iscoroutinefunction(client.get_historical_data):
-                    historical_data = await client.get_historical_data()
-                else:
-                    historical_data = client.get_historical_data()
+                historical_data = await _call(client.get_historical_data)
                 
                 if not historical_data:
-                    logger.warning(f"No historical data returned for ring {ring_id}")
+                    logger.warning("No historical data returned for ring %s", ring_id)
                     return False
                 
-                logger.info(f"Received historical data for ring {ring_id}")
+                logger.info("Received historical data for ring %s", ring_id)
                 
                 synced_data = False
                 
                 # Process steps history
-                if 'steps_history' in historical_data and historical_data['steps_history']:
-                    steps_count = 0
-                    for entry in historical_data['steps_history']:
-                        timestamp = entry.get('timestamp')
-                        steps = entry.get('value')
-                        if timestamp and steps:
-                            # Convert timestamp to datetime if needed
-                            if isinstance(timestamp, str):
-                                try:
-                                    timestamp = datetime.fromisoformat(timestamp)
-                                except ValueError:
-                                    # Try different format if isoformat fails
-                                    timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-                            # Add to database with specific timestamp
-                            self.db.add_steps_with_timestamp(ring_id, steps, timestamp)
-                            steps_count += 1
-                    logger.info(f"Synced {steps_count} steps entries for ring {ring_id}")
-                    if steps_count > 0:
+                steps_history = historical_data.get('steps_history')
+                if steps_history:
+                    steps_rows = _history_rows(steps_history)
+                    if steps_rows:
+                        self.db.add_steps_bulk(ring_id, steps_rows)
                         synced_data = True
+                    logger.info("Synced %s steps entries for ring %s", len(steps_rows), ring_id)
                 
                 # Process heart rate history
-                if 'heart_rate_history' in historical_data and historical_data['heart_rate_history']:
-                    hr_count = 0
-                    for entry in historical_data['heart_rate_history']:
-                        timestamp = entry.get('timestamp')
-                        heart_rate = entry.get('value')
-                        if timestamp and heart_rate:
-                            # Convert timestamp to datetime if needed
-                            if isinstance(timestamp, str):
-                                try:
-                                    timestamp = datetime.fromisoformat(timestamp)
-                                except ValueError:
-                                    # Try different format if isoformat fails
-                                    timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-                            # Add to database with specific timestamp
-                            self.db.add_heart_rate_with_timestamp(ring_id, heart_rate, timestamp)
-                            hr_count += 1
-                    logger.info(f"Synced {hr_count} heart rate entries for ring {ring_id}")
-                    if hr_count > 0:
+                heart_rate_history = historical_data.get('heart_rate_history')
+                if heart_rate_history:
+                    hr_rows = _history_rows(heart_rate_history)
+                    if hr_rows:
+                        self.db.add_heart_rate_bulk(ring_id, hr_rows)
                         synced_data = True
+                    logger.info("Synced %s heart rate entries for ring %s", len(hr_rows), ring_id)
                 
                 # Update the last sync time in the database
                 if synced_data:
                     self.db.update_last_sync(ring_id)
-                    logger.info(f"Historical data sync completed for ring {ring_id}")
+                    self.notify_ring_updated(ring_id)
+                    logger.info("Historical data sync completed for ring %s", ring_id)
                     return True
                 else:
-                    logger.warning(f"No data was synced for ring {ring_id}")
+                    logger.warning("No data was synced for ring %s", ring_id)
                     return False
                 
             except Exception as e:
-                logger.error(f"Error syncing historical data for ring {ring_id}: {e}")
+                logger.error("Error syncing historical data for ring %s: %s", ring_id, e)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error in sync_historical_data_for_ring for ring {ring_id}: {e}")
+            logger.error("Error in sync_historical_data_for_ring for ring %s: %s", ring_id, e)
             return False
 
 # Singleton instance
 _instance = None
+_instance_lock = threading.Lock()
 
 def get_ring_manager(db_path: Optional[str] = None) -> RingManager:
     """Get the ring manager instance."""
     global _instance
     
+    # Only take the lock while the instance may still need creating
     if _instance is None:
-        if db_path:
-            db = Database()
-            _instance = RingManager(db)
-        else:
-            _instance = RingManager()
+        with _instance_lock:
+            if _instance is None:
+                if db_path:
+                    db = Database()
+                    _instance = RingManager(db)
+                else:
+                    _instance = RingManager()
         
     return _instance 
\ No newline at end of file
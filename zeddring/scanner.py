@@ -1,26 +1,27 @@
 """Custom scanner module for Zeddring."""
 
 import logging
-import subprocess
-import time
+import shutil
 import random
 import datetime
 import asyncio
 import re
+import functools
+import array
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Set
 from bleak import BleakScanner, BleakError
 from zeddring.database import get_db_connection
+from zeddring.config import BLE_MIN_RSSI
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("zeddring.scanner")
 
 # Define the Colmi device name pattern - match more possible names
 COLMI_DEVICE_PATTERN = re.compile(r'(colmi|r02|smart\s*ring|band|watch)', re.IGNORECASE)
+# Stricter pattern for the rings the manager actually connects to
+RING_NAME_PATTERN = re.compile(r'Colmi|R02')
+# A real BLE address such as 00:11:22:33:44:55
+MAC_ADDRESS_PATTERN = re.compile(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$')
 
 @dataclass
 class ColmiDevice:
@@ -28,140 +29,191 @@ class ColmiDevice:
     name: str
     address: str
 
-async def scan_with_bleak(timeout: int = 10) -> List[Dict[str, Any]]:
-    """Scan for BLE devices using Bleak."""
+# Device lines printed by "hcitool lescan" and "bluetoothctl scan on"
+HCITOOL_LINE_PATTERN = re.compile(r'^([0-9A-F]{2}(?::[0-9A-F]{2}){5})\s+(.*)$', re.IGNORECASE)
+BLUETOOTHCTL_LINE_PATTERN = re.compile(r'NEW\]\s+Device\s+([0-9A-F]{2}(?::[0-9A-F]{2}){5})\s+(.*)$', re.IGNORECASE)
+_ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*m|[\x01\x02]')
+
+# Fallback scanning tools, resolved once per process
+HCITOOL_PATH = shutil.which("hcitool")
+BLUETOOTHCTL_PATH = shutil.which("bluetoothctl")
+
+async def _start_scanner(on_advert: Callable, min_rssi: int) -> BleakScanner:
+    """
+    Start a BleakScanner that asks BlueZ to drop adverts weaker than min_rssi
+    before they reach us. Other backends ignore the bluez arguments. If BlueZ
+    rejects the discovery filter, scan unfiltered instead.
+    """
+    scanner = BleakScanner(detection_callback=on_advert, bluez={"filters": {"RSSI": min_rssi}})
+    try:
+        await scanner.start()
+    except BleakError as e:
+        logger.warning("BlueZ discovery filter rejected, scanning unfiltered: %s", e)
+        scanner = BleakScanner(detection_callback=on_advert)
+        await scanner.start()
+    return scanner
+
+async def scan_with_bleak(timeout: int = 10, settle: float = 1.0,
+                          target_addresses: Optional[Set[str]] = None,
+                          min_rssi: int = BLE_MIN_RSSI) -> Optional[List[Dict[str, Any]]]:
+    """
+    Scan for BLE devices using Bleak, ignoring adverts weaker than min_rssi.
+    With target_addresses, stops as soon as every one of them has been seen.
+    Otherwise stops once a Colmi device has been seen and settle more
+    seconds have passed to pick up any other nearby rings.
+    Returns None if the scan could not run at all.
+    """
     logger.info("Scanning for Bluetooth devices using Bleak...")
     try:
-        devices = await BleakScanner.discover(timeout=timeout)
-        logger.info(f"Found {len(devices)} devices with Bleak")
+        devices = {}
+        ring_seen = asyncio.Event()
+        missing = {address.upper() for address in target_addresses} if target_addresses else None
         
-        found_devices = []
-        for device in devices:
+        def on_advert(device, advertisement_data):
+            if advertisement_data.rssi < min_rssi:
+                return
             device_info = {
                 "address": device.address,
-                "name": device.name or "Unknown",
-                "rssi": device.rssi,
-                "metadata": device.metadata
+                "name": device.name or advertisement_data.local_name or "Unknown",
+                "rssi": advertisement_data.rssi
             }
-            logger.debug(f"Found device: {device_info}")
-            found_devices.append(device_info)
+            devices[device.address] = device_info
+            if ring_seen.is_set():
+                return
+            if missing is not None:
+                missing.discard(device.address.upper())
+                if not missing:
+                    ring_seen.set()
+            elif is_colmi_device(device_info):
+                ring_seen.set()
+        
+        scanner = await _start_scanner(on_advert, min_rssi)
+        try:
+            await asyncio.wait_for(ring_seen.wait(), timeout=timeout)
+            if missing is None:
+                await asyncio.sleep(settle)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await scanner.stop()
+        
+        found_devices = list(devices.values())
+        logger.info("Found %s devices with Bleak", len(found_devices))
+        if logger.isEnabledFor(logging.DEBUG):
+            for device_info in found_devices:
+                logger.debug("Found device: %s", device_info)
         
         return found_devices
     except BleakError as e:
-        logger.error(f"Bleak scanning error: {e}")
-        return []
+        logger.error("Bleak scanning error: %s", e)
+        return None
     except Exception as e:
-        logger.error(f"Unexpected error during Bleak scanning: {e}")
-        return []
+        logger.error("Unexpected error during Bleak scanning: %s", e)
+        return None
 
-def scan_with_hcitool() -> List[Dict[str, Any]]:
+async def _read_scan_output(command: List[str], pattern: re.Pattern, timeout: float = 5.0, quiet: float = 2.0) -> Dict[str, str]:
+    """
+    Run a scanning command and collect the devices matching pattern as its
+    output arrives.
+    Stops at the timeout, when the command exits, or once devices have been
+    found and no new ones show up for the quiet period.
+    Returns a dict mapping MAC address to name.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    loop = asyncio.get_running_loop()
+    found = {}
+    start = last_new = loop.time()
+    try:
+        while True:
+            now = loop.time()
+            wait = start + timeout - now
+            if found:
+                wait = min(wait, last_new + quiet - now)
+            if wait <= 0:
+                break
+            try:
+                line = await asyncio.wait_for(process.stdout.readline(), wait)
+            except asyncio.TimeoutError:
+                break
+            if not line:
+                break
+            match = pattern.search(_ANSI_ESCAPE_PATTERN.sub("", line.decode(errors="replace")))
+            if not match:
+                continue
+            mac, name = match.group(1).upper(), match.group(2).strip()
+            if name in ("", "(unknown)"):
+                name = "Unknown"
+            if mac not in found:
+                last_new = loop.time()
+            if found.get(mac, "Unknown") == "Unknown":
+                found[mac] = name
+    finally:
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), 1)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        # Drain to EOF so the pipe transport closes with the process
+        try:
+            await asyncio.wait_for(process.stdout.read(), 1)
+        except asyncio.TimeoutError:
+            pass
+    return found
+
+async def scan_with_hcitool() -> List[Dict[str, Any]]:
     """Scan for BLE devices using hcitool."""
+    if not HCITOOL_PATH:
+        logger.debug("hcitool not installed, skipping")
+        return []
     logger.info("Scanning for Bluetooth devices using hcitool...")
     try:
-        # Run hcitool lescan for a short time
-        process = subprocess.Popen(
-            ["timeout", "5", "hcitool", "lescan"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        time.sleep(5)  # Give it time to scan
-        process.terminate()
-        
-        # Now get the cached results
-        result = subprocess.run(
-            ["hcitool", "leinfo", "--cached"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            logger.warning(f"hcitool command failed: {result.stderr}")
-            return []
-        
-        # Parse the output
-        found_devices = []
-        lines = result.stdout.strip().split('\n')
-        current_device = None
-        
-        for line in lines:
-            if ":" in line and len(line.split(':')) == 6:  # MAC address format
-                mac = line.strip()
-                current_device = {
-                    "address": mac,
-                    "name": "Unknown",
-                    "rssi": None
-                }
-                found_devices.append(current_device)
-            elif current_device and "Name" in line:
-                name_match = re.search(r'Name:\s+(.+)', line)
-                if name_match:
-                    current_device["name"] = name_match.group(1)
+        # Names are often only in later adverts, so keep duplicates
+        found = await _read_scan_output([HCITOOL_PATH, "lescan", "--duplicates"], HCITOOL_LINE_PATTERN)
+        found_devices = [
+            {"address": mac, "name": name, "rssi": None}
+            for mac, name in found.items()
+        ]
         
-        logger.info(f"Found {len(found_devices)} devices with hcitool")
+        logger.info("Found %s devices with hcitool", len(found_devices))
         return found_devices
     except Exception as e:
-        logger.error(f"Error scanning with hcitool: {e}")
+        logger.error("Error scanning with hcitool: %s", e)
         return []
 
-def scan_with_bluetoothctl() -> List[Dict[str, Any]]:
+async def scan_with_bluetoothctl() -> List[Dict[str, Any]]:
     """Scan for BLE devices using bluetoothctl."""
+    if not BLUETOOTHCTL_PATH:
+        logger.debug("bluetoothctl not installed, skipping")
+        return []
     logger.info("Scanning for Bluetooth devices using bluetoothctl...")
     try:
-        # Start scan
-        subprocess.run(
-            ["bluetoothctl", "scan", "on"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            timeout=2
-        )
-        
-        # Wait for scan to collect some data
-        time.sleep(5)
-        
-        # Get devices
-        result = subprocess.run(
-            ["bluetoothctl", "devices"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        # Stop scan
-        subprocess.run(
-            ["bluetoothctl", "scan", "off"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        
-        if result.returncode != 0:
-            logger.warning(f"bluetoothctl command failed: {result.stderr}")
-            return []
-        
-        # Parse the output
-        found_devices = []
-        device_pattern = re.compile(r'Device\s+([0-9A-F:]+)\s+(.*)')
-        
-        for line in result.stdout.strip().split('\n'):
-            match = device_pattern.match(line)
-            if match:
-                mac, name = match.groups()
-                device_info = {
-                    "address": mac,
-                    "name": name or "Unknown",
-                    "rssi": None
-                }
-                found_devices.append(device_info)
+        # Read the "[NEW] Device" lines printed while the scan runs
+        found = await _read_scan_output([BLUETOOTHCTL_PATH, "--timeout", "5", "scan", "on"],
+                                  BLUETOOTHCTL_LINE_PATTERN)
+        found_devices = [
+            {"address": mac, "name": name, "rssi": None}
+            for mac, name in found.items()
+        ]
         
-        logger.info(f"Found {len(found_devices)} devices with bluetoothctl")
+        logger.info("Found %s devices with bluetoothctl", len(found_devices))
         return found_devices
     except Exception as e:
-        logger.error(f"Error scanning with bluetoothctl: {e}")
+        logger.error("Error scanning with bluetoothctl: %s", e)
         return []
 
 def is_colmi_device(device: Dict[str, Any]) -> bool:
     """Check if a device is a Colmi device based on its name."""
-    name = device.get("name", "").lower()
+    return _is_colmi(device.get("name") or "", device.get("address") or "")
+
+# Devices re-advertise about once a second, so remember each name/address verdict
+@functools.lru_cache(maxsize=1024)
+def _is_colmi(name: str, mac: str) -> bool:
+    """Match a device name and MAC address against the known Colmi patterns."""
+    name = name.lower()
     
     # Check for common patterns in device names
     if COLMI_DEVICE_PATTERN.search(name):
@@ -169,7 +221,7 @@ def is_colmi_device(device: Dict[str, Any]) -> bool:
         
     # Check for specific MAC address prefixes known to be used by Colmi devices
     # (This is a placeholder - you would need to add actual known prefixes)
-    mac = device.get("address", "").lower()
+    mac = mac.lower()
     known_prefixes = ["a4:c1", "00:1a", "ac:23"]  # Example prefixes, replace with actual ones
     
     for prefix in known_prefixes:
@@ -178,36 +230,44 @@ def is_colmi_device(device: Dict[str, Any]) -> bool:
             
     return False
 
-async def scan_for_devices(timeout: int = 10) -> List[Dict[str, Any]]:
+# Fallback scan methods after Bleak, and whether each goes through BlueZ D-Bus
+FALLBACK_BACKENDS = (
+    (scan_with_hcitool, False),
+    (scan_with_bluetoothctl, True),
+)
+
+async def scan_for_devices(timeout: int = 10,
+                           target_addresses: Optional[Set[str]] = None,
+                           min_rssi: int = BLE_MIN_RSSI) -> List[Dict[str, Any]]:
     """
     Scan for Colmi devices using multiple methods.
-    Returns a list of found Colmi devices.
+    Returns a list of found Colmi devices. target_addresses lets the Bleak
+    scan finish as soon as all of those rings have advertised.
     """
     logger.info("Starting scan for Colmi devices...")
     
-    # Try different scanning methods
-    all_devices = []
-    
     # Method 1: Bleak
-    bleak_devices = await scan_with_bleak(timeout)
-    all_devices.extend(bleak_devices)
+    bleak_devices = await scan_with_bleak(timeout, target_addresses=target_addresses, min_rssi=min_rssi)
+    # bluetoothctl drives the same BlueZ D-Bus discovery Bleak uses, so it is
+    # only worth starting when Bleak could not reach BlueZ at all
+    bluez_reachable = bleak_devices is not None
+    all_devices = bleak_devices or []
     
-    # If Bleak didn't find any devices, try other methods
-    if not bleak_devices:
+    # If Bleak didn't find any devices, try the other methods in order until
+    # one finds something. The tools share the adapter with Bleak and each
+    # other, so one at a time.
+    if not all_devices:
         logger.warning("Bleak scanning found no devices, trying alternative methods")
-        
-        # Method 2: hcitool
-        hcitool_devices = scan_with_hcitool()
-        all_devices.extend(hcitool_devices)
-        
-        # Method 3: bluetoothctl
-        if not hcitool_devices:
-            bluetoothctl_devices = scan_with_bluetoothctl()
-            all_devices.extend(bluetoothctl_devices)
+        for backend, uses_bluez in FALLBACK_BACKENDS:
+            if uses_bluez and bluez_reachable:
+                continue
+            all_devices = await backend()
+            if all_devices:
+                break
     
     # Filter for Colmi devices
     colmi_devices = [device for device in all_devices if is_colmi_device(device)]
-    logger.info(f"Found {len(colmi_devices)} Colmi devices out of {len(all_devices)} total devices")
+    logger.info("Found %s Colmi devices out of %s total devices", len(colmi_devices), len(all_devices))
     
     # If no devices found, log a warning but don't add a mock device
     if not colmi_devices:
@@ -215,9 +275,41 @@ async def scan_for_devices(timeout: int = 10) -> List[Dict[str, Any]]:
     
     return colmi_devices
 
+async def watch_for_devices(callback: Callable[[Dict[str, Any]], None],
+                            is_running: Callable[[], bool],
+                            min_rssi: int = BLE_MIN_RSSI) -> None:
+    """
+    Report Colmi devices as their advertisements arrive, ignoring adverts
+    weaker than min_rssi.
+    Calls callback with the device info for every matching advertisement
+    until is_running returns False.
+    """
+    def on_advert(device, advertisement_data):
+        if advertisement_data.rssi < min_rssi:
+            return
+        device_info = {
+            "address": device.address,
+            "name": device.name or advertisement_data.local_name or "Unknown",
+            "rssi": advertisement_data.rssi
+        }
+        if is_colmi_device(device_info):
+            callback(device_info)
+    
+    scanner = await _start_scanner(on_advert, min_rssi)
+    try:
+        while is_running():
+            await asyncio.sleep(1)
+    finally:
+        await scanner.stop()
+
 class MockColmiR02Client:
     """Mock implementation of ColmiR02Client for testing."""
     
+    # Seconds a mock reboot takes; set to 0 to make reboots instant
+    REBOOT_DELAY: float = 2.0
+    # Number of heart rate noise samples drawn from the RNG at a time
+    NOISE_BUFFER_SIZE = 1024
+    
     def __init__(self, address):
         """Initialize the mock client."""
         self.address = address
@@ -231,103 +323,108 @@ class MockColmiR02Client:
             'heart_rate_history': []
         }
         self._time_set = False
+        self._noise_buf = array.array('b')
+        self._noise_i = 0
         
         # Generate some historical data
         self._generate_historical_data()
         
     def _generate_historical_data(self):
         """Generate mock historical data."""
-        # Generate data for the past 24 hours
+        # Generate data for the past 24 hours, formatting each timestamp once
         now = datetime.datetime.now()
-        for i in range(24):
-            timestamp = now - datetime.timedelta(hours=i)
-            
-            # Add steps data (increasing throughout the day)
-            steps_value = 5000 - (i * 200) + random.randint(-100, 100)
-            steps_value = max(0, steps_value)  # Ensure non-negative
-            
-            self._historical_data['steps_history'].append({
-                'timestamp': timestamp.isoformat(),
-                'value': steps_value
-            })
-            
-            # Add heart rate data (varying throughout the day)
-            base_hr = 70
-            if i < 8:  # Sleeping hours
-                base_hr = 60
-            elif i > 16:  # Evening activity
-                base_hr = 75
-                
-            hr_value = base_hr + random.randint(-5, 10)
+        hour = datetime.timedelta(hours=1)
+        timestamps = [(now - i * hour).isoformat() for i in range(24)]
+        randint = random.randint
+        
+        # Steps data (increasing throughout the day, never negative)
+        self._historical_data['steps_history'] = [
+            {'timestamp': timestamp, 'value': max(0, 5000 - (i * 200) + randint(-100, 100))}
+            for i, timestamp in enumerate(timestamps)
+        ]
+        
+        # Heart rate data (lower while sleeping, higher in the evening)
+        self._historical_data['heart_rate_history'] = [
+            {'timestamp': timestamp, 'value': (60 if i < 8 else 75 if i > 16 else 70) + randint(-5, 10)}
+            for i, timestamp in enumerate(timestamps)
+        ]
             
-            self._historical_data['heart_rate_history'].append({
-                'timestamp': timestamp.isoformat(),
-                'value': hr_value
-            })
+    def _hr_noise(self) -> int:
+        """Return the next heart rate fluctuation in -5..5 from a pre-drawn buffer."""
+        while self._noise_i >= len(self._noise_buf):
+            raw = random.getrandbits(8 * self.NOISE_BUFFER_SIZE).to_bytes(self.NOISE_BUFFER_SIZE, 'little')
+            # Bytes from 253 up are dropped so each of the 11 values is equally likely
+            self._noise_buf = array.array('b', (byte % 11 - 5 for byte in raw if byte < 253))
+            self._noise_i = 0
+        delta = self._noise_buf[self._noise_i]
+        self._noise_i += 1
+        return delta
             
     async def connect(self):
         """Mock connect method."""
-        logger.info(f"Mock connecting to {self.address}")
+        logger.debug("Mock connecting to %s", self.address)
         self.connected = True
         return True
             
     async def disconnect(self):
         """Mock disconnect method."""
-        logger.info(f"Mock disconnecting from {self.address}")
+        logger.debug("Mock disconnecting from %s", self.address)
         self.connected = False
         return True
         
     def get_battery(self):
         """Mock get_battery method."""
-        logger.info(f"Mock getting battery for {self.address}")
+        logger.debug("Mock getting battery for %s", self.address)
         # Simulate battery drain
         self._battery = max(0, self._battery - random.randint(0, 2))
         return self._battery
             
     def get_steps(self):
         """Mock get_steps method."""
-        logger.info(f"Mock getting steps for {self.address}")
+        logger.debug("Mock getting steps for %s", self.address)
         # Simulate steps increasing more realistically
-        time_since_last_sync = (datetime.datetime.now() - self._last_sync).total_seconds()
+        now = datetime.datetime.now()
+        time_since_last_sync = (now - self._last_sync).total_seconds()
         # Add 10-30 steps per minute on average
         steps_to_add = int((time_since_last_sync / 60) * random.randint(10, 30))
         self._steps += steps_to_add
-        self._last_sync = datetime.datetime.now()
+        self._last_sync = now
         return self._steps
             
     def get_real_time_heart_rate(self):
         """Mock get_real_time_heart_rate method."""
-        logger.info(f"Mock getting heart rate for {self.address}")
+        logger.debug("Mock getting heart rate for %s", self.address)
         # Simulate heart rate fluctuations
         self._heart_rate = [
-            max(60, min(100, hr + random.randint(-5, 5)))
+            max(60, min(100, hr + self._hr_noise()))
             for hr in self._heart_rate
         ]
         return self._heart_rate
         
     async def get_heart_rate(self):
         """Mock get_heart_rate method."""
-        logger.info(f"Mock getting heart rate for {self.address}")
+        logger.debug("Mock getting heart rate for %s", self.address)
         # Simulate heart rate fluctuations
-        hr = max(60, min(100, self._heart_rate[0] + random.randint(-5, 5)))
+        hr = max(60, min(100, self._heart_rate[0] + self._hr_noise()))
         self._heart_rate[0] = hr
         return hr
         
     async def get_historical_data(self):
         """Mock get_historical_data method."""
-        logger.info(f"Mock getting historical data for {self.address}")
+        logger.debug("Mock getting historical data for %s", self.address)
         return self._historical_data
         
     async def set_time(self, current_time):
         """Mock set_time method."""
-        logger.info(f"Mock setting time for {self.address} to {current_time}")
+        logger.debug("Mock setting time for %s to %s", self.address, current_time)
         self._time_set = True
         return True
         
     async def reboot(self):
         """Mock reboot method."""
-        logger.info(f"Mock rebooting {self.address}")
+        logger.debug("Mock rebooting %s", self.address)
         self.connected = False
         # Simulate reboot time
-        await asyncio.sleep(2)
+        if self.REBOOT_DELAY:
+            await asyncio.sleep(self.REBOOT_DELAY)
         return True 
\ No newline at end of file
@@ -4,51 +4,258 @@ import os
 import logging
 from typing import Dict, Any, List, Optional
 import datetime
-import asyncio
 import json
-
-from flask import Flask, render_template, request, jsonify, redirect, url_for, abort, current_app, flash, session
+import time
+import threading
+import functools
+import hashlib
+import concurrent.futures
+from collections import OrderedDict
+
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, abort, current_app, flash, session
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
-from zeddring.config import WEB_HOST, WEB_PORT, DEBUG
-from zeddring.database import Database, get_db_connection
-from zeddring.ring_manager import RingManager, get_ring_manager, Ring
+from zeddring.config import WEB_HOST, WEB_PORT, DEBUG, WEB_THREADS
+from zeddring.database import row_get
+from zeddring.ring_manager import RingManager, get_ring_manager, Ring, RING_OPERATION_TIMEOUT
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("zeddring.web")
 
+# Production WSGI server; the Flask development server is used without it
+try:
+    import waitress
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+# Response compression; responses are sent uncompressed without it
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
+# Faster JSON encoding; the standard library json module is used without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson.
+    
+    Keys are sorted like Flask's default provider, and datetimes and other
+    types orjson does not handle natively fall back to Flask's conversions.
+    """
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if ORJSON_AVAILABLE else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype)
+
+# Browsers may keep static files requested with a content hash this long (seconds)
+STATIC_MAX_AGE = 31536000
+
+class ZeddringFlask(Flask):
+    """Flask app that lets browsers cache content-hashed static URLs for a year."""
+    
+    def get_send_file_max_age(self, filename):
+        if request.args.get('v'):
+            return STATIC_MAX_AGE
+        return super().get_send_file_max_age(filename)
+
 # Create Flask app
-app = Flask(__name__, 
+app = ZeddringFlask(__name__, 
             template_folder=os.path.join(os.path.dirname(__file__), 'templates'),
             static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 CORS(app)
+# Compression runs after the views and appends ":gzip"/":br" to their ETags;
+# conditional_response compares If-None-Match with that suffix removed
+if COMPRESS_AVAILABLE:
+    app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript']
+    app.config['COMPRESS_LEVEL'] = 4
+    Compress(app)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 
 # Set a secret key for session and flash messages
 app.secret_key = os.environ.get('ZEDDRING_SECRET_KEY', 'zeddring-secret-key')
 
-# Initialize database and ring manager
-db = Database()
-ring_manager = None
+def _hash_static_files(folder):
+    """Map each file under the static folder to a short hash of its contents."""
+    hashes = {}
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+            hashes[os.path.relpath(path, folder).replace(os.sep, '/')] = digest
+    return hashes
+
+_static_hashes = _hash_static_files(app.static_folder)
+
+@app.context_processor
+def asset_helper():
+    """Provide asset(filename), a static URL that changes whenever the file does."""
+    def asset(filename):
+        version = _static_hashes.get(filename)
+        if version:
+            return url_for('static', filename=filename, v=version)
+        return url_for('static', filename=filename)
+    return {'asset': asset}
 
 def init_app(db_path=None):
-    """Initialize the app with the ring manager."""
-    global ring_manager
+    """Initialize the app with the ring manager and its database.
+    
+    Views use the ring manager's Database so that ring cache invalidations
+    made by either side are seen by both.
+    """
     ring_manager = get_ring_manager(db_path)
+    app.config['RING_MANAGER'] = ring_manager
+    app.config['DATABASE'] = ring_manager.db
+    
+    # Compile the templates now instead of during the first request for each;
+    # outside debug mode Jinja keeps them without checking the files again
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
     return app
 
+# How long cached API responses are served (seconds): ring status and recent
+# readings, daily aggregates, and multi-day statistics
+CACHE_SHORT = 5
+CACHE_NORMAL = 30
+CACHE_LONG = 60
+# Seconds between keep-alive comments on an event stream, and how long a
+# stream stays open before the browser is left to reconnect. Each open stream
+# occupies one server thread, so only a quarter of them may hold streams.
+EVENT_KEEPALIVE = 15
+EVENT_STREAM_LIFETIME = 300
+MAX_EVENT_STREAMS = max(1, WEB_THREADS // 4)
+# Most rings accepted by one batch request
+MAX_BATCH_RINGS = 100
+# Number of distinct request URLs kept in the response cache
+RESPONSE_CACHE_SIZE = 256
+
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+_event_streams = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+# Futures of the responses being computed, by request path, so that
+# concurrent requests for the same path run the view only once
+_pending_responses = {}
+# (ring status list, HTML) of the last dashboard rendered without flash messages
+_index_page = (None, None)
+# Error page HTML by template name; the pages take no context
+_error_pages = {}
+
+def invalidate_response_cache():
+    """Drop every cached API response, e.g. after a ring was added or changed."""
+    with _response_cache_lock:
+        _response_cache.clear()
+
+def cached_response(timeout):
+    """
+    Cache successful responses of a GET view for timeout seconds, keyed by the
+    full request path including the query string. Requests arriving while
+    the view runs for the same path wait for its response instead of running
+    it again. If the view raises, the last cached response is served instead
+    with a "110 Response is stale" warning.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.full_path
+            with _response_cache_lock:
+                entry = _response_cache.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return app.response_class(entry[1], status=entry[2], mimetype=entry[3])
+                pending = _pending_responses.get(key)
+                running = pending is not None
+                if not running:
+                    pending = _pending_responses[key] = concurrent.futures.Future()
+            try:
+                if running:
+                    body, status, mimetype = pending.result()
+                    return app.response_class(body, status=status, mimetype=mimetype)
+                try:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code == 200:
+                        with _response_cache_lock:
+                            _response_cache[key] = (time.monotonic() + timeout, response.get_data(),
+                                                    response.status_code, response.mimetype)
+                            _response_cache.move_to_end(key)
+                            if len(_response_cache) > RESPONSE_CACHE_SIZE:
+                                _response_cache.popitem(last=False)
+                    pending.set_result((response.get_data(), response.status_code, response.mimetype))
+                except BaseException as e:
+                    pending.set_exception(e)
+                    raise
+                finally:
+                    with _response_cache_lock:
+                        del _pending_responses[key]
+                return response
+            except Exception:
+                if not entry:
+                    raise
+                logger.exception("Serving stale response for %s", key)
+                stale = app.response_class(entry[1], status=entry[2], mimetype=entry[3])
+                stale.headers['Warning'] = '110 - "Response is stale"'
+                return stale
+        return wrapper
+    return decorator
+
+# Services a view can ask with_services for, with the name used in errors
+SERVICES = {'ring_manager': ('RING_MANAGER', "Ring manager"), 'database': ('DATABASE', "Database")}
+
+def with_services(*names):
+    """
+    Pass the app's ring manager and/or database to a JSON view as keyword
+    arguments, answering 500 if one of them is not configured.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            for name in names:
+                config_key, label = SERVICES[name]
+                service = current_app.config.get(config_key)
+                if not service:
+                    return jsonify({"success": False, "error": f"{label} not available"}), 500
+                kwargs[name] = service
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
 @app.route('/')
 def index():
-    """Render the dashboard page."""
+    """Render the dashboard page.
+    
+    get_ring_status returns the same list object until its cache expires or
+    is invalidated, so the page rendered for that list is reused until then.
+    Pages with pending flash messages are always rendered.
+    """
+    global _index_page
     ring_manager = current_app.config.get('RING_MANAGER')
     if not ring_manager:
         return "Ring manager not available", 500
         
     rings = ring_manager.get_ring_status()
-    return render_template('index.html', rings=rings)
+    if session.get('_flashes'):
+        return render_template('index.html', rings=rings)
+    
+    cached_rings, html = _index_page
+    if cached_rings is not rings:
+        html = render_template('index.html', rings=rings)
+        _index_page = (rings, html)
+    return html
 
 @app.route('/ring/<int:ring_id>')
 def ring_detail(ring_id):
@@ -63,23 +270,98 @@ def ring_detail(ring_id):
         
     return render_template('ring_detail.html', ring=ring_data)
 
+def etag_matches(etag):
+    """
+    Check whether the request's If-None-Match names etag. Flask-Compress
+    appends ":gzip" or ":br" to the ETag of compressed responses, so clients
+    send those variants back; the suffix is ignored when comparing.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return True
+    return any(tag.split(':', 1)[0] == etag for tag in if_none_match.as_set(include_weak=True))
+
+def conditional_response(max_age):
+    """
+    Tag successful responses with an ETag derived from the body, let clients
+    reuse them for max_age seconds, and answer 304 Not Modified when the
+    client already has the current version.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+                response.cache_control['stale-while-revalidate'] = CACHE_NORMAL
+                response.vary.add('Accept-Encoding')
+                etag = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+                response.set_etag(etag)
+                if etag_matches(etag):
+                    not_modified = app.response_class(status=304)
+                    for header in ('ETag', 'Cache-Control', 'Vary'):
+                        not_modified.headers[header] = response.headers[header]
+                    return not_modified
+            return response
+        return wrapper
+    return decorator
+
 @app.route('/api/rings')
-def api_rings():
-    """API endpoint to get all rings."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
+@conditional_response(CACHE_SHORT)
+@cached_response(CACHE_SHORT)
+@with_services('ring_manager')
+def api_rings(ring_manager):
+    """API endpoint to get all rings.
+    
+    Pass ?layout=columns to get one list per field instead of one object per ring.
+    """
+    if request.args.get('layout') == 'columns':
+        return jsonify(ring_manager.get_ring_status_columnar())
         
     rings = ring_manager.get_ring_status()
     return jsonify(rings)
 
+def _batch_ring_ids():
+    """Parse ?ids=1,2,3 (or repeated ids parameters), or return None if invalid."""
+    try:
+        ring_ids = [int(part) for value in request.args.getlist('ids') for part in value.split(',') if part]
+    except ValueError:
+        return None
+    if not ring_ids or len(ring_ids) > MAX_BATCH_RINGS:
+        return None
+    return list(dict.fromkeys(ring_ids))
+
+@app.route('/api/rings/heart-rate', methods=['GET'])
+@conditional_response(CACHE_SHORT)
+@cached_response(CACHE_SHORT)
+@with_services('database')
+def get_heart_rate_data_batch(database):
+    """Get heart rate data for several rings, e.g. ?ids=1,2,3."""
+    ring_ids = _batch_ring_ids()
+    if ring_ids is None:
+        return jsonify({"error": f"ids must list between 1 and {MAX_BATCH_RINGS} ring ids"}), 400
+    
+    return jsonify(database.get_heart_rate_data_batch(ring_ids, limit=100))
+
+@app.route('/api/rings/steps', methods=['GET'])
+@conditional_response(CACHE_SHORT)
+@cached_response(CACHE_SHORT)
+@with_services('database')
+def get_steps_data_batch(database):
+    """Get steps data for several rings, e.g. ?ids=1,2,3."""
+    ring_ids = _batch_ring_ids()
+    if ring_ids is None:
+        return jsonify({"error": f"ids must list between 1 and {MAX_BATCH_RINGS} ring ids"}), 400
+    
+    return jsonify(database.get_steps_data_batch(ring_ids, limit=100))
+
 @app.route('/api/ring/<int:ring_id>')
-def api_ring_detail(ring_id):
+@conditional_response(CACHE_SHORT)
+@cached_response(CACHE_SHORT)
+@with_services('ring_manager')
+def api_ring_detail(ring_id, ring_manager):
     """API endpoint to get ring details."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
     ring_data = ring_manager.get_ring_data(ring_id)
     if not ring_data:
         return jsonify({"error": "Ring not found"}), 404
@@ -101,18 +383,21 @@ def add_ring():
             return "Database not available", 500
             
         ring_id = database.add_ring(name, mac_address)
+        invalidate_response_cache()
+        
+        ring_manager = current_app.config.get('RING_MANAGER')
+        if ring_manager:
+            ring_manager.invalidate_rings_cache()
         return redirect(url_for('index'))
         
     return render_template('add_ring.html')
 
 @app.route('/api/ring/<int:ring_id>/remove', methods=['POST'])
-def remove_ring(ring_id):
+@with_services('ring_manager')
+def remove_ring(ring_id, ring_manager):
     """Remove a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
     success = ring_manager.remove_ring(ring_id)
+    invalidate_response_cache()
     
     return jsonify({
         "success": success,
@@ -122,7 +407,7 @@ def remove_ring(ring_id):
 @app.route('/connect_ring/<int:ring_id>', methods=['GET', 'POST'])
 def connect_ring(ring_id):
     """Connect to a ring."""
-    logger.info(f"Connecting to ring {ring_id}")
+    logger.info("Connecting to ring %s", ring_id)
     
     # Get ring manager from app config
     ring_manager = current_app.config.get('RING_MANAGER')
@@ -144,46 +429,34 @@ def connect_ring(ring_id):
     
     # Connect to ring
     try:
-        # Create a new event loop for the connection
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         # Get the ring's MAC address - handle sqlite3.Row objects
-        mac_address = ring['mac_address'] if 'mac_address' in ring.keys() else None
+        mac_address = row_get(ring, 'mac_address')
         if not mac_address:
             flash(f"Ring with ID {ring_id} has no MAC address", "error")
             return redirect(url_for('index'))
         
         # Connect to the ring
         connected = ring_manager._connect_to_ring(mac_address, ring_id)
+        invalidate_response_cache()
         
-        ring_name = ring['name'] if 'name' in ring.keys() else 'Unknown Ring'
+        ring_name = row_get(ring, 'name', 'Unknown Ring')
         if connected:
             flash(f"Successfully connected to ring {ring_name}", "success")
         else:
             flash(f"Failed to connect to ring {ring_name}", "error")
     except Exception as e:
-        logger.error(f"Error connecting to ring {ring_id}: {e}")
+        logger.error("Error connecting to ring %s: %s", ring_id, e)
         flash(f"Error connecting to ring: {str(e)}", "error")
     
     return redirect(url_for('index'))
 
 @app.route('/api/ring/<int:ring_id>/disconnect', methods=['POST'])
-def disconnect_ring(ring_id):
+@with_services('ring_manager')
+def disconnect_ring(ring_id, ring_manager):
     """Disconnect from a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
-    # Create a new event loop for this request
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    # Disconnect from the ring using our updated method
-    success = loop.run_until_complete(ring_manager.disconnect_ring(ring_id))
-    
-    # Close the loop
-    loop.close()
+    # Disconnect from the ring on the manager's event loop
+    success = ring_manager.run_coroutine(ring_manager.disconnect_ring(ring_id), RING_OPERATION_TIMEOUT)
+    invalidate_response_cache()
     
     if success:
         return jsonify({
@@ -197,12 +470,11 @@ def disconnect_ring(ring_id):
         }), 500
 
 @app.route('/api/ring/<int:ring_id>/data', methods=['GET'])
-def get_ring_data(ring_id):
+@conditional_response(CACHE_SHORT)
+@cached_response(CACHE_SHORT)
+@with_services('ring_manager')
+def get_ring_data(ring_id, ring_manager):
     """Get data from a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
     # Get data from the ring
     data = ring_manager.get_ring_data(ring_id)
     
@@ -217,15 +489,46 @@ def get_ring_data(ring_id):
             "error": "Failed to get data from ring"
         })
 
+@app.route('/api/ring/<int:ring_id>/events', methods=['GET'])
+@with_services('ring_manager')
+def ring_events(ring_id, ring_manager):
+    """Server-sent event stream with one "update" event per batch of new readings.
+    
+    Answers 503 when MAX_EVENT_STREAMS streams are already open; the page
+    then falls back to polling.
+    """
+    if not ring_manager.db.get_ring(ring_id):
+        return jsonify({"success": False, "error": "Ring not found"}), 404
+    if not _event_streams.acquire(blocking=False):
+        return jsonify({"success": False, "error": "Too many event streams"}), 503, {'Retry-After': str(EVENT_STREAM_LIFETIME)}
+    
+    def generate():
+        version = ring_manager.wait_for_ring_update(ring_id, None, 0)
+        # Send something straight away so clients and proxies see the stream open
+        yield ": open\n\n"
+        deadline = time.monotonic() + EVENT_STREAM_LIFETIME
+        while time.monotonic() < deadline:
+            current = ring_manager.wait_for_ring_update(ring_id, version, EVENT_KEEPALIVE)
+            if current != version:
+                version = current
+                yield f"event: update\ndata: {version}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # The server closes the response when the stream ends or the client is gone
+    response.call_on_close(_event_streams.release)
+    return response
+
 @app.route('/api/ring/<int:ring_id>/heart-rate', methods=['GET'])
-def get_heart_rate_data(ring_id):
+@conditional_response(CACHE_SHORT)
+@cached_response(CACHE_SHORT)
+@with_services('database')
+def get_heart_rate_data(ring_id, database):
     """Get heart rate data for a ring."""
     days = request.args.get('days', 1, type=int)
     
-    database = current_app.config.get('DATABASE')
-    if not database:
-        return jsonify({"error": "Database not available"}), 500
-        
     # Get heart rate data
     heart_rate_data = database.get_heart_rate_data(ring_id, limit=100)
     
@@ -235,42 +538,38 @@ def get_heart_rate_data(ring_id):
     ])
 
 @app.route('/api/ring/<int:ring_id>/heart-rate/stats', methods=['GET'])
-def get_heart_rate_stats(ring_id):
+@conditional_response(CACHE_NORMAL)
+@cached_response(CACHE_LONG)
+@with_services('database')
+def get_heart_rate_stats(ring_id, database):
     """Get heart rate statistics for a ring."""
     days = request.args.get('days', 30, type=int)
     
-    database = current_app.config.get('DATABASE')
-    if not database:
-        return jsonify({"error": "Database not available"}), 500
-        
     # Get heart rate stats
     stats = database.get_daily_heart_rate_stats(ring_id, days)
     
     return jsonify(stats)
 
 @app.route('/api/ring/<int:ring_id>/steps/stats', methods=['GET'])
-def get_steps_stats(ring_id):
+@conditional_response(CACHE_NORMAL)
+@cached_response(CACHE_LONG)
+@with_services('database')
+def get_steps_stats(ring_id, database):
     """Get steps statistics for a ring."""
     days = request.args.get('days', 30, type=int)
     
-    database = current_app.config.get('DATABASE')
-    if not database:
-        return jsonify({"error": "Database not available"}), 500
-        
     # Get steps stats
     stats = database.get_daily_steps_stats(ring_id, days)
     
     return jsonify(stats)
 
 @app.route('/api/ring/<int:ring_id>/history', methods=['GET'])
-def get_ring_history(ring_id):
+@conditional_response(CACHE_NORMAL)
+@with_services('ring_manager')
+def get_ring_history(ring_id, ring_manager):
     """Get ring data history."""
     days = request.args.get('days', 7, type=int)
     
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
     history = ring_manager.get_ring_history(ring_id, days)
     
     return jsonify({
@@ -279,14 +578,13 @@ def get_ring_history(ring_id):
     })
 
 @app.route('/api/ring/<int:ring_id>/daily', methods=['GET'])
-def get_daily_data(ring_id):
+@conditional_response(CACHE_NORMAL)
+@cached_response(CACHE_NORMAL)
+@with_services('ring_manager')
+def get_daily_data(ring_id, ring_manager):
     """Get daily data for a ring."""
     date = request.args.get('date')
     
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
     daily_data = ring_manager.get_daily_data(ring_id, date)
     
     return jsonify({
@@ -295,12 +593,9 @@ def get_daily_data(ring_id):
     })
 
 @app.route('/api/ring/<int:ring_id>/rename', methods=['POST'])
-def rename_ring(ring_id):
+@with_services('database')
+def rename_ring(ring_id, database):
     """Rename a ring."""
-    database = current_app.config.get('DATABASE')
-    if not database:
-        return jsonify({"error": "Database not available"}), 500
-        
     # Get the new name from the request
     data = request.get_json()
     if not data or 'name' not in data:
@@ -317,33 +612,24 @@ def rename_ring(ring_id):
         
     # Update the ring name
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE rings SET name = ? WHERE id = ?", (new_name, ring_id))
-        conn.commit()
-        conn.close()
+        database.rename_ring(ring_id, new_name)
+        invalidate_response_cache()
+        ring_manager = current_app.config.get('RING_MANAGER')
+        if ring_manager:
+            ring_manager.invalidate_rings_cache()
         
         return jsonify({"success": True})
     except Exception as e:
-        logger.error(f"Error renaming ring {ring_id}: {e}")
+        logger.error("Error renaming ring %s: %s", ring_id, e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/ring/<int:ring_id>/sync', methods=['POST'])
-def sync_ring_data(ring_id):
+@with_services('ring_manager')
+def sync_ring_data(ring_id, ring_manager):
     """Sync historical data from a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
-    # Create a new event loop for this request
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    # Sync historical data using our new method
-    success = loop.run_until_complete(ring_manager.sync_historical_data_for_ring(ring_id))
-    
-    # Close the loop
-    loop.close()
+    # Sync historical data on the manager's event loop
+    success = ring_manager.run_coroutine(ring_manager.sync_historical_data_for_ring(ring_id), RING_OPERATION_TIMEOUT)
+    invalidate_response_cache()
     
     if success:
         return jsonify({
@@ -357,108 +643,75 @@ def sync_ring_data(ring_id):
         }), 500
 
 @app.route('/api/ring/<int:ring_id>/set-time', methods=['POST'])
-def set_ring_time(ring_id):
+@with_services('ring_manager')
+def set_ring_time(ring_id, ring_manager):
     """Set the time on a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"error": "Ring manager not available"}), 500
-        
     # Check if the ring exists
     ring = ring_manager.db.get_ring(ring_id)
     if not ring:
         return jsonify({"success": False, "error": "Ring not found"}), 404
         
     # Check if the ring is connected
-    # The RingManager doesn't have a 'rings' attribute, so we need to check the connected_rings
-    mac_address = ring['mac_address'] if 'mac_address' in ring.keys() else None
-    if not mac_address or mac_address not in ring_manager.connected_rings or not ring_manager.connected_rings[mac_address]:
+    mac_address = row_get(ring, 'mac_address')
+    if not mac_address or not ring_manager.is_connected(mac_address):
         return jsonify({"success": False, "error": "Ring is not connected"}), 400
         
     try:
-        # Create a new event loop for this request
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         # Get the client
-        client = ring_manager.clients.get(mac_address)
+        client = ring_manager.get_client(mac_address)
         if not client:
             return jsonify({"success": False, "error": "Client not found for ring"}), 500
             
         # Create a temporary Ring object to set time
-        temp_ring = Ring(ring_id, ring['name'] if 'name' in ring.keys() else 'Unknown', mac_address)
+        temp_ring = Ring(ring_id, row_get(ring, 'name', 'Unknown'), mac_address)
         temp_ring.client = client
         temp_ring.connected = True
         
         # Set the time on the ring
-        success = loop.run_until_complete(temp_ring.set_ring_time())
-        
-        # Close the loop
-        loop.close()
+        success = ring_manager.run_coroutine(temp_ring.set_ring_time(), RING_OPERATION_TIMEOUT)
         
         if success:
             return jsonify({"success": True, "message": "Ring time set successfully"})
         else:
             return jsonify({"success": False, "error": "Failed to set ring time"}), 500
     except Exception as e:
-        logger.error(f"Error setting time for ring {ring_id}: {e}")
+        logger.error("Error setting time for ring %s: %s", ring_id, e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/ring/<int:ring_id>/connect', methods=['POST'])
-def api_connect_ring(ring_id):
+@with_services('ring_manager', 'database')
+def api_connect_ring(ring_id, ring_manager, database):
     """API endpoint to connect to a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"success": False, "error": "Ring manager not available"}), 500
-        
     # Check if the ring exists
-    database = current_app.config.get('DATABASE')
-    if not database:
-        return jsonify({"success": False, "error": "Database not available"}), 500
-        
     ring = database.get_ring(ring_id)
     if not ring:
         return jsonify({"success": False, "error": "Ring not found"}), 404
         
     # Get the ring's MAC address - handle sqlite3.Row objects
-    mac_address = ring['mac_address'] if 'mac_address' in ring.keys() else None
+    mac_address = row_get(ring, 'mac_address')
     if not mac_address:
         return jsonify({"success": False, "error": "Ring has no MAC address"}), 400
     
     try:
-        # Create a new event loop for this request
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Connect to the ring
-        success = loop.run_until_complete(ring_manager.connect_ring(ring_id))
-        
-        # Close the loop
-        loop.close()
+        # Connect to the ring on the manager's event loop
+        success = ring_manager.run_coroutine(ring_manager.connect_ring(ring_id), RING_OPERATION_TIMEOUT)
+        invalidate_response_cache()
         
         if success:
             return jsonify({"success": True, "message": "Successfully connected to ring"})
         else:
             return jsonify({"success": False, "error": "Failed to connect to ring"}), 500
     except Exception as e:
-        logger.error(f"Error connecting to ring {ring_id}: {e}")
+        logger.error("Error connecting to ring %s: %s", ring_id, e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/ring/<int:ring_id>/reboot', methods=['POST'])
-def reboot_ring(ring_id):
+@with_services('ring_manager')
+def reboot_ring(ring_id, ring_manager):
     """Reboot a ring."""
-    ring_manager = current_app.config.get('RING_MANAGER')
-    if not ring_manager:
-        return jsonify({"success": False, "error": "Ring manager not available"}), 500
-    
-    # Create a new event loop for this request
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    # Reboot the ring using our new method
-    success = loop.run_until_complete(ring_manager.reboot_ring(ring_id))
-    
-    # Close the loop
-    loop.close()
+    # Reboot the ring on the manager's event loop
+    success = ring_manager.run_coroutine(ring_manager.reboot_ring(ring_id), RING_OPERATION_TIMEOUT)
+    invalidate_response_cache()
     
     if success:
         return jsonify({
@@ -474,29 +727,54 @@ def reboot_ring(ring_id):
 # Custom Jinja2 filter for JSON serialization
 @app.template_filter('tojson')
 def to_json(value):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode()
     return json.dumps(value)
 
+def render_error_page(template):
+    """Render an error page once and return the stored HTML afterwards."""
+    html = _error_pages.get(template)
+    if html is None:
+        html = _error_pages[template] = render_template(template)
+    return html
+
 @app.errorhandler(404)
 def page_not_found(e):
     """Handle 404 errors."""
-    return render_template('404.html'), 404
+    return render_error_page('404.html'), 404
 
 @app.errorhandler(500)
 def server_error(e):
     """Handle 500 errors."""
-    return render_template('500.html'), 500
+    return render_error_page('500.html'), 500
+
+def run_server(host=WEB_HOST, port=WEB_PORT, debug=DEBUG):
+    """
+    Serve the app with waitress when it is installed, or the Flask development
+    server in debug mode or without it. Waitress runs in this process, so
+    requests share the ring manager and its BLE connections.
+    """
+    if debug or not WAITRESS_AVAILABLE:
+        if not debug:
+            logger.warning("waitress not installed, using the Flask development server")
+        app.run(host=host, port=port, debug=debug)
+        return
+    waitress.serve(app, host=host, port=port, threads=WEB_THREADS)
 
 def start_web_server():
     """Start the web server."""
     # Start the ring manager
-    ring_manager = get_ring_manager()
-    ring_manager.start()
+    init_app()
+    app.config['RING_MANAGER'].start()
     
     # Start the web server
-    app.config['RING_MANAGER'] = ring_manager
-    app.config['DATABASE'] = db
-    app.run(host=WEB_HOST, port=WEB_PORT, debug=DEBUG)
+    run_server(WEB_HOST, WEB_PORT, DEBUG)
 
 
 if __name__ == '__main__':
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     start_web_server()